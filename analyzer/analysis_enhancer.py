@@ -1,7 +1,55 @@
 import streamlit as st
 import os
 import json
-import google.generativeai as genai
+from llm.response_cache import cache_key, get_response_cache
+from llm.resilience import stream_llm
+from llm.prompt_budget import prepare_prompt_text
+from llm.stream_json import JsonMemberStream, StreamJsonError, iter_json_members
+
+ATS_MODEL = "gemini-2.5-flash"
+
+# Receives a hedged duplicate of slow ATS requests
+ATS_FALLBACK_MODEL = "gemini-2.0-flash"
+
+# Bump whenever the ATS prompt changes, so answers cached for the old prompt are not reused
+ATS_PROMPT_VERSION = "ats-v2"
+HYBRID_PROMPT_VERSION = "ats-hybrid-v1"
+
+# Categories of the full AI analysis, in display order
+ATS_CATEGORIES = [
+    "Contact Information", "Spelling & Grammar", "Personal Pronoun Usage", "Skills & Keyword Targeting",
+    "Complex or Long Sentences", "Generic or Weak Phrases", "Passive Voice Usage", "Quantified Achievements",
+    "Required Resume Sections", "AI-generated Language", "Repeated Action Verbs",
+    "Visual Formatting or Readability", "Personal Information / Bias Triggers", "Other Strengths and Weaknesses",
+]
+
+# Hybrid mode: the category each local check answers...
+LOCAL_CHECK_CATEGORIES = {
+    "contact": "Contact Information",
+    "pronouns": "Personal Pronoun Usage",
+    "skills": "Skills & Keyword Targeting",
+    "long_sentences": "Complex or Long Sentences",
+    "generic_phrases": "Generic or Weak Phrases",
+    "passive_voice": "Passive Voice Usage",
+    "metrics": "Quantified Achievements",
+    "sections": "Required Resume Sections",
+    "action_verbs": "Repeated Action Verbs",
+    "document": "Visual Formatting or Readability",
+    "formatting": "Visual Formatting or Readability",
+}
+
+# ...and the ones left to the model, which need judgment rather than rules
+HYBRID_AI_CATEGORIES = [
+    "Spelling & Grammar", "Tone & Professionalism", "AI-generated Language", "Personal Information / Bias Triggers",
+]
+
+
+class AiResponseError(Exception):
+    """The model answered, but not with usable JSON. `payload` is the text that failed to parse."""
+
+    def __init__(self, message, payload=None):
+        super().__init__(message)
+        self.payload = payload
 
 def get_gemini_api_key():
     api_key = os.getenv("GEMINI_API_KEY")
@@ -17,11 +65,8 @@ def get_gemini_api_key():
             st.session_state.gemini_api_key = st.text_input("Enter Gemini API Key", type="password")
     return st.session_state.gemini_api_key
 
-def perform_ai_ats_analysis(text, api_key):
-    genai.configure(api_key=api_key)
-    model = genai.GenerativeModel("gemini-2.5-flash")
-
-    prompt = f"""
+def build_ats_prompt(text):
+    return f"""
         You are an expert ATS (Applicant Tracking System) resume reviewer. Analyze the resume below across these categories:
 
         1. Contact Information  
@@ -72,27 +117,141 @@ def perform_ai_ats_analysis(text, api_key):
         {text}
         """
 
+
+
+def extract_ats_json(raw_text):
+    """The JSON object in a model answer, validated; raises AiResponseError otherwise."""
+    json_start = raw_text.find("{")
+    json_end = raw_text.rfind("}") + 1
+
+    if json_start == -1 or json_end == -1:
+        raise AiResponseError("❌ No JSON block detected in the AI response.")
+
+    json_str = raw_text[json_start:json_end]
+
+    try:
+        json.loads(json_str)
+    except json.JSONDecodeError as json_err:
+        raise AiResponseError(f"❌ Failed to parse AI response as JSON: {json_err}", json_str)
+    return json_str
+
+
+def stream_ats_answer(prompt, prompt_version, cache_inputs, api_key, bypass_cache=False, usage=None):
+    """
+    Yields (key, value) for each top-level member of the model's JSON answer to `prompt` as
+    soon as it is complete. A cached answer (by model, `prompt_version` and `cache_inputs`) is
+    replayed through the same parser; a streamed one is cached once it has fully arrived.
+    `usage["cached"]` is set to whether the answer came from the cache, and a streamed answer
+    adds its estimated input and output tokens (see llm.resilience.record_usage).
+    """
+    cache = get_response_cache()
+    key = cache_key(ATS_MODEL, prompt_version, *cache_inputs)
+    cached = None if bypass_cache else cache.get(key)
+    if usage is not None:
+        usage["cached"] = cached is not None
+    if cached is not None:
+        yield from iter_json_members([cached])
+        return
+
+    parser = JsonMemberStream()
+    received = []
     try:
-        response = model.generate_content(prompt)
-        raw_text = response.text.strip()
+        for chunk in stream_llm(api_key, ATS_MODEL, prompt, usage=usage):
+            received.append(chunk)
+            yield from parser.feed(chunk)
+        parser.close()
+    except StreamJsonError as err:
+        raise AiResponseError(f"❌ Failed to parse AI response as JSON: {err}", "".join(received)) from err
 
-        json_start = raw_text.find("{")
-        json_end = raw_text.rfind("}") + 1
+    # Only well-formed answers reach the cache
+    cache.put(key, extract_ats_json("".join(received).strip()), ATS_MODEL, prompt_version)
 
-        if json_start == -1 or json_end == -1:
-            st.error("❌ No JSON block detected in the AI response.")
-            st.stop()
 
-        json_str = raw_text[json_start:json_end]
+def stream_ai_ats_analysis(text, api_key, bypass_cache=False, usage=None):
+    """
+    Gemini's 14-category ATS review of `text`: yields (category, value) pairs, "ATS_Score"
+    included, as soon as each one is complete in the model's answer. The text is compacted
+    and capped to the token budget before sending (see llm.prompt_budget), and answers are
+    cached on disk by model, prompt version and compacted text; `bypass_cache` forces a fresh one.
+    A `usage` dict, if given, receives the prompt_budget stats, whether the answer was cached
+    and, for a streamed answer, its estimated input and output tokens.
+    Raises AiResponseError for malformed answers and lets other errors through, since the
+    caller has usually rendered part of the result already. Transient errors before the
+    first chunk are retried, and a failing provider raises CircuitOpenError at once.
+    """
+    text, stats = prepare_prompt_text(text)
+    if usage is not None:
+        usage.update(stats)
+    yield from stream_ats_answer(build_ats_prompt(text), ATS_PROMPT_VERSION, (text,), api_key, bypass_cache, usage)
+
+
+def local_ats_categories(local_sections):
+    """
+    The local check results in the AI answer's format, {category: {"Positives", "Negatives"}},
+    in the AI categories' order; passed checks are positives and warnings negatives.
+    """
+    categories = {}
+    for section in local_sections:
+        category = LOCAL_CHECK_CATEGORIES.get(section["name"])
+        if category is None:
+            continue
+        results = categories.setdefault(category, {"Positives": [], "Negatives": []})
+        for level, message in section["findings"]:
+            results["Negatives" if level == "warning" else "Positives"].append(message)
+    return dict(sorted(categories.items(), key=lambda item: ATS_CATEGORIES.index(item[0])))
+
+
+def build_hybrid_prompt(text, local_sections):
+    # Only what the model needs to weigh: which checks passed, and the warnings of the rest
+    checked = {
+        "passed": [s["title"] for s in local_sections if all(level != "warning" for level, _ in s["findings"])],
+        "issues": {
+            s["title"]: [message for level, message in s["findings"] if level == "warning"]
+            for s in local_sections if any(level == "warning" for level, _ in s["findings"])
+        },
+    }
+    categories = ",\n".join(
+        f'        "{category}": {{"Positives": ["..."], "Negatives": ["..."]}}' for category in HYBRID_AI_CATEGORIES
+    )
+    return f"""
+        You are an expert ATS (Applicant Tracking System) resume reviewer. Rule-based checks have already been run on the resume below; their results are:
+
+        {json.dumps(checked, ensure_ascii=False)}
+
+        Do NOT repeat those checks. Review only what needs judgment: {", ".join(HYBRID_AI_CATEGORIES)}.
+        Then give an overall ATS score that takes both the rule-based results and your review into account.
+
+        Return a **single valid JSON object**, and nothing else, in exactly this format:
+
+        {{
+        "ATS_Score": (integer from 0 to 100),
+{categories}
+        }}
+
+        Rules:
+            -   You MUST return valid JSON that can be parsed directly by Python's json.loads()
+            -   Include both "Positives" and "Negatives" for every category, even if a list is empty ([])
+            -   Do NOT output markdown, comments, explanations, or headings
+            -   Every entry should be specific, constructive, and example-backed, quoting the resume where useful
+
+        Resume Text:
+        {text}
+        """
+
 
-        try:
-            parsed = json.loads(json_str)
-            return parsed
-        except json.JSONDecodeError as json_err:
-            st.error(f"❌ Failed to parse AI response as JSON: {json_err}")
-            st.code(json_str, language="json")
-            st.stop()
+def stream_hybrid_ats_analysis(text, api_key, local_sections, bypass_cache=False, usage=None):
+    """
+    Hybrid ATS analysis: the categories the local checks already cover are yielded first,
+    straight from `local_sections` (run_ats_report(...).sections), and the model is asked
+    only for the judgment categories and the score, with the local results in its prompt.
+    Yields the same (category, value) pairs, and fills `usage` the same way, as stream_ai_ats_analysis.
+    """
+    yield from local_ats_categories(local_sections).items()
 
-    except Exception as e:
-        st.error(f"❌ Unexpected error during AI analysis: {e}")
-        st.stop()
+    text, stats = prepare_prompt_text(text)
+    if usage is not None:
+        usage.update(stats)
+    local_summary = json.dumps([[s["name"], s["findings"]] for s in local_sections])
+    yield from stream_ats_answer(
+        build_hybrid_prompt(text, local_sections), HYBRID_PROMPT_VERSION, (text, local_summary), api_key, bypass_cache, usage
+    )
@@ -0,0 +1,128 @@
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Callable, NamedTuple
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
+
+# Comma-separated check names to skip in this deployment, e.g. ATS_DISABLED_CHECKS=skills,grammar
+DISABLED_CHECKS_ENV = "ATS_DISABLED_CHECKS"
+
+# Threads for checks flagged `concurrent`; everything else runs inline on the calling thread
+CHECK_WORKERS = 2
+
+
+class Finding(NamedTuple):
+    """One line of ATS feedback. Unpacks as (level, message) like the original tuples."""
+    level: str  # "success" or "warning"
+    message: str
+
+
+@dataclass(frozen=True)
+class AtsCheck:
+    name: str
+    step: int
+    title: str
+    requires: tuple
+    run: Callable
+    # Worth a thread: the check spends its time in native code that releases the GIL
+    concurrent: bool = False
+
+
+@dataclass(frozen=True)
+class AtsInput:
+    name: str
+    requires: tuple
+    build: Callable
+
+
+ATS_CHECKS = {}
+ATS_INPUTS = {}
+
+
+def ats_check(name, step, title, requires=("text",), concurrent=False):
+    """Registers `fn(inputs) -> list[Finding]` as an ATS check reading the named inputs."""
+    def register(fn):
+        ATS_CHECKS[name] = AtsCheck(name, step, title, tuple(requires), fn, concurrent)
+        return fn
+    return register
+
+
+def ats_input(name, requires=("text",)):
+    """Registers `fn(inputs) -> value` as a shared input derived from other inputs."""
+    def register(fn):
+        ATS_INPUTS[name] = AtsInput(name, tuple(requires), fn)
+        return fn
+    return register
+
+
+class CheckInputs:
+    """
+    Shared inputs for one analysis run. Base values (text, file metadata, nlp) are given;
+    derived ones are built on first request, once, and timed.
+    """
+
+    def __init__(self, **values):
+        self._values = dict(values)
+        self.timings = {}
+
+    def __getitem__(self, name):
+        if name not in self._values:
+            spec = ATS_INPUTS.get(name)
+            if spec is None:
+                raise KeyError(f"Unknown ATS input: {name}")
+            for dependency in spec.requires:
+                self[dependency]
+            start = time.perf_counter()
+            self._values[name] = spec.build(self)
+            self.timings[name] = time.perf_counter() - start
+        return self._values[name]
+
+    def prepare(self, names):
+        for name in names:
+            self[name]
+
+
+@dataclass
+class AtsReport:
+    sections: list
+    # Wall time in seconds per check, and per shared input built for this run
+    check_timings: dict = field(default_factory=dict)
+    input_timings: dict = field(default_factory=dict)
+
+
+def disabled_checks():
+    return {name.strip() for name in os.getenv(DISABLED_CHECKS_ENV, "").split(",") if name.strip()}
+
+
+def _timed(check, inputs):
+    start = time.perf_counter()
+    findings = [Finding(*finding) for finding in check.run(inputs)]
+    return findings, time.perf_counter() - start
+
+
+def run_ats_checks(inputs, disabled=None, max_workers=CHECK_WORKERS):
+    """
+    Runs every enabled check against `inputs` and returns the sections in step order.
+    Inputs the checks declare are built up front on this thread, so checks only read them.
+    """
+    disabled = disabled_checks() if disabled is None else set(disabled)
+    checks = sorted((c for c in ATS_CHECKS.values() if c.name not in disabled), key=lambda c: c.step)
+
+    inputs.prepare(dict.fromkeys(name for check in checks for name in check.requires))
+
+    results = {}
+    background = [c for c in checks if c.concurrent] if max_workers > 1 else []
+    with ThreadPoolExecutor(max_workers=max_workers) if background else nullcontext() as pool:
+        futures = {check.name: pool.submit(_timed, check, inputs) for check in background}
+        for check in checks:
+            if check.name not in futures:
+                results[check.name] = _timed(check, inputs)
+        for name, future in futures.items():
+            results[name] = future.result()
+
+    return AtsReport(
+        sections=[{"name": c.name, "step": c.step, "title": c.title, "findings": results[c.name][0]} for c in checks],
+        check_timings={c.name: results[c.name][1] for c in checks},
+        input_timings=dict(inputs.timings),
+    )
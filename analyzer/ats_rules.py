@@ -0,0 +1,129 @@
+import re
+from collections import Counter
+import numpy as np
+
+# Rule lexicons for the local ATS checks. Each list is compiled once, at import, into a
+# single combined matcher so a check makes one pass over the text instead of one per entry.
+
+GENERIC_PHRASES = [
+    "responsible for", "worked on", "helped", "tasked with", "participated in", "assisted with", "handled",
+    "involved in", "part of", "supported", "duties included", "played a role in", "knowledge of", "familiar with",
+    "exposure to", "experience in", "performed", "used to", "took part in", "made", "did", "contributed to", "led",
+    "managed", "oversaw", "ran", "coordinated", "scheduled", "organized", "arranged", "created", "built", "developed",
+    "designed", "engineered", "deployed", "launched", "implemented", "executed", "collaborated with", "worked closely with",
+    "worked as", "worked under", "followed up on", "took responsibility for", "supervised", "trained", "mentored",
+    "assumed responsibility for", "provided support", "provided assistance", "gave input on", "attended", "joined",
+    "contributed", "assumed the role of", "followed", "performed duties", "assigned to", "utilized", "used",
+    "applied knowledge of", "leveraged", "made sure", "ensured", "ensured compliance", "validated", "checked",
+    "verified", "responded to", "answered", "dealt with", "addressed", "resolved", "fixed", "improved", "streamlined",
+    "upgraded", "enhanced", "maintained", "supported users", "gave feedback", "filled in", "acted as", "liaised with",
+    "followed procedures", "enforced policies", "interfaced with", "contributed ideas", "wrote", "edited", "documented",
+    "reported on", "compiled", "tracked", "monitored", "recorded", "calculated", "evaluated", "tested", "analyzed data",
+    "reviewed", "produced", "submitted"
+]
+
+PASSIVE_INDICATORS = [
+    "was", "were", "is", "are", "been", "being", "be",
+    "has been", "have been", "had been",
+    "will be", "would be", "shall be", "should be", "can be", "could be", "may be", "might be", "must be"
+]
+
+ACTION_VERBS = [
+    "achieved", "administered", "analyzed", "arranged", "built", "calculated", "collaborated", "communicated",
+    "completed", "conducted", "created", "debugged", "designed", "developed", "directed", "documented", "enhanced",
+    "engineered", "executed", "facilitated", "formulated", "generated", "handled", "implemented", "improved",
+    "initiated", "inspired", "integrated", "led", "managed", "monitored", "negotiated", "organized", "oversaw",
+    "performed", "planned", "presented", "programmed", "provided", "redesigned", "researched", "resolved", "reviewed",
+    "scheduled", "solved", "streamlined", "supervised", "supported", "tested", "trained", "translated", "upgraded",
+    "utilized", "validated", "wrote"
+]
+
+
+def trie_regex(words):
+    """
+    Regex alternation for a word list, factored into a character trie so the engine does
+    not retry every word at every position. At each position it matches the longest word.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node):
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # A word ends here but longer ones continue: greedy optional prefers the longer match
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+class PhraseCounter:
+    """
+    Counts substring occurrences of many phrases in one regex pass, with the same
+    per-phrase, non-overlapping semantics as calling str.count() for each phrase.
+    """
+
+    def __init__(self, phrases):
+        self.phrases = list(phrases)
+        # The lookahead reports the longest phrase starting at each position
+        self.pattern = re.compile("(?=(" + trie_regex(self.phrases) + "))")
+        # Every phrase that is a prefix of another also occurs wherever the longer one does
+        self.prefixes = {p: [q for q in self.phrases if p.startswith(q)] for p in self.phrases}
+
+    def count(self, text):
+        next_free = dict.fromkeys(self.phrases, 0)
+        counts = Counter()
+        for match in self.pattern.finditer(text):
+            start = match.start()
+            for phrase in self.prefixes[match.group(1)]:
+                # str.count never counts an occurrence overlapping the previous one
+                if start >= next_free[phrase]:
+                    counts[phrase] += 1
+                    next_free[phrase] = start + len(phrase)
+        # Report in lexicon order, like the original per-phrase loop
+        return {phrase: counts[phrase] for phrase in self.phrases if counts[phrase]}
+
+
+def compile_word_pattern(words):
+    """Whole-word matcher for a word list; equivalent to tokenizing on \\b\\w+\\b and testing membership."""
+    return re.compile(r"\b(?:" + trie_regex(words) + r")\b")
+
+
+def compile_passive_pattern(indicators):
+    """One regex equivalent to trying `\\b{aux}\\b\\s+\\b\\w+(ed|en)\\b` for every auxiliary in turn."""
+    return re.compile(r"\b(?:" + "|".join(indicators) + r")\b\s+\b\w+(ed|en)\b", re.IGNORECASE)
+
+
+# Dependency labels the English parser puts on passive subjects and auxiliaries
+PASSIVE_DEPS = ("nsubjpass", "csubjpass", "auxpass")
+
+
+def passive_sentence_mask(doc, sentences):
+    """
+    One flag per sentence: True where the parse marks a passive subject or auxiliary.
+    Reads the dependency labels already on the Doc as one array; no per-token Python work.
+    """
+    dep_ids = [doc.vocab.strings.add(label) for label in PASSIVE_DEPS]
+    passive_so_far = np.concatenate(([0], np.cumsum(np.isin(doc.to_array("DEP"), dep_ids))))
+    starts = np.fromiter((sent.start for sent in sentences), dtype=np.int64, count=len(sentences))
+    ends = np.fromiter((sent.end for sent in sentences), dtype=np.int64, count=len(sentences))
+    return passive_so_far[ends] > passive_so_far[starts]
+
+
+GENERIC_PHRASE_COUNTER = PhraseCounter(GENERIC_PHRASES)
+ACTION_VERB_PATTERN = compile_word_pattern(ACTION_VERBS)
+PASSIVE_PATTERN = compile_passive_pattern(PASSIVE_INDICATORS)
+
+# Remaining single-purpose patterns, compiled once instead of per call
+EMAIL_PATTERN = re.compile(r"[\w\.-]+@[\w\.-]+")
+PHONE_PATTERN = re.compile(r"\+?\d[\d\s\-]{7,15}")
+LINKEDIN_PATTERN = re.compile(r"linkedin\.com/in/\S+")
+GRAMMAR_PATTERN = re.compile(r"\b[A-Z][a-z]+ [a-z]+ [A-Z][a-z]+\b")
+PRONOUN_PATTERN = re.compile(r"\b(I|me|my|mine|we|our)\b", re.IGNORECASE)
+METRIC_PATTERN = re.compile(r"\d+%|\d{2,}")
+BULLET_PATTERN = re.compile(r"\n[^\n•\-–●\*]")
@@ -0,0 +1,103 @@
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from preprocessor.batch import find_resumes, init_pool_worker
+from preprocessor.parser import extract_text_from_path
+from analyzer.resume_analysis import run_ats_report, warmup
+
+# CSV output has one row per finding
+CSV_FIELDS = ["File", "Step", "Check", "Level", "Message", "Error"]
+
+
+def audit_resume(path):
+    """Parses and analyzes one file → (path, report, error); errors are reported, not raised."""
+    try:
+        text = extract_text_from_path(path)
+        return path, run_ats_report(text, os.path.basename(path), os.path.getsize(path)), None
+    except Exception as e:
+        return path, None, str(e)
+
+
+def audit_resumes(paths, workers=None):
+    """Yields (path, AtsReport, error) for each file as it finishes, fanned out over a process pool."""
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1:
+        warmup()
+        for path in paths:
+            yield audit_resume(path)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_pool_worker, initargs=(warmup,)) as pool:
+        futures = [pool.submit(audit_resume, path) for path in paths]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def report_record(path, report, error=None):
+    """One JSON Lines record per file."""
+    if report is None:
+        return {"file": path, "error": error}
+    return {
+        "file": path,
+        "warnings": sum(level == "warning" for section in report.sections for level, _ in section["findings"]),
+        "sections": [
+            {"step": s["step"], "title": s["title"], "findings": [f._asdict() for f in s["findings"]]}
+            for s in report.sections
+        ],
+        "check_ms": {name: round(t * 1000, 2) for name, t in report.check_timings.items()},
+        "error": None,
+    }
+
+
+def report_rows(path, report, error=None):
+    if report is None:
+        return [{"File": path, "Step": "", "Check": "", "Level": "", "Message": "", "Error": error}]
+    return [
+        {"File": path, "Step": s["step"], "Check": s["title"], "Level": f.level, "Message": f.message, "Error": ""}
+        for s in report.sections for f in s["findings"]
+    ]
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Run the local ATS checks over a folder of resumes.")
+    arg_parser.add_argument("resume_dir", nargs="?", default="data/resumes", help="Folder searched recursively for PDF/DOCX resumes")
+    arg_parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    arg_parser.add_argument("--output", "-o", help="Output file (default: stdout)")
+    arg_parser.add_argument("--format", choices=["jsonl", "csv"], help="Output format (default: from --output extension, else jsonl)")
+    args = arg_parser.parse_args(argv)
+
+    out_format = args.format or ("csv" if args.output and args.output.lower().endswith(".csv") else "jsonl")
+    paths = find_resumes(args.resume_dir, recursive=True)
+
+    out = open(args.output, "w", newline="", encoding="utf-8") if args.output else sys.stdout
+    writer = csv.DictWriter(out, fieldnames=CSV_FIELDS) if out_format == "csv" else None
+    if writer:
+        writer.writeheader()
+
+    failed = 0
+    start = time.perf_counter()
+    try:
+        for done, (path, report, error) in enumerate(audit_resumes(paths, args.workers), 1):
+            # Written as each file completes, so partial output survives an interrupted run
+            if writer:
+                writer.writerows(report_rows(path, report, error))
+            else:
+                out.write(json.dumps(report_record(path, report, error), ensure_ascii=False) + "\n")
+            out.flush()
+            failed += report is None
+            print(f"[{done}/{len(paths)}] {path}" + (f": error: {error}" if error else ""), file=sys.stderr)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - start
+
+    print(f"{len(paths)} documents ({failed} failed) in {elapsed:.2f}s ({len(paths) / elapsed if elapsed else 0:.1f} docs/s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+import re
+import time
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from analyzer.ats_checks import CheckInputs, run_ats_checks
+from analyzer.resume_analysis import get_nlp, scan_sentences, text_tallies, merge_tallies
+from preprocessor.skills import skill_tokens, ngrams_from_tokens
+from preprocessor.skill_registry import get_skill_registry
+
+# A segment ends at sentence-final punctuation closing a line, the same point where sentence
+# splitting cuts. Like spaCy, the punctuation keeps one trailing space; the line break stays
+# with the next segment, as it does with the next sentence
+SEGMENT_END = re.compile(r"[.!?] ?(?=[^\S\n]*\n)")
+
+# Parsed segments kept per analyzer; a resume has a few dozen, so this covers many revisions
+SEGMENT_CACHE_SIZE = 2048
+
+# Skill phrase matches kept per analyzer; a resume yields a few thousand 1- to 5-word phrases
+SKILL_MATCH_CACHE_SIZE = 32768
+
+
+def split_segments(text):
+    """Splits text into consecutive segments that concatenate back to exactly `text`."""
+    segments = []
+    start = 0
+    for match in SEGMENT_END.finditer(text):
+        segments.append(text[start:match.end()])
+        start = match.end()
+    if start < len(text):
+        segments.append(text[start:])
+    return segments
+
+
+def segment_key(segment):
+    return hashlib.blake2b(segment.encode("utf-8"), digest_size=16).digest()
+
+
+@dataclass(frozen=True)
+class SegmentPartial:
+    """Everything the checks need from one segment, computed from its own parse."""
+    tallies: dict
+    tokens: tuple
+    long_sentences: tuple
+    passive_sentences: tuple
+
+
+def analyze_segment(segment, doc):
+    sentences = list(doc.sents)
+    long_sents, passive_sentences = scan_sentences(doc, sentences)
+    return SegmentPartial(
+        tallies=text_tallies(segment),
+        tokens=tuple(skill_tokens(doc)),
+        long_sentences=tuple(long_sents),
+        passive_sentences=tuple(passive_sentences),
+    )
+
+
+class IncrementalAtsAnalyzer:
+    """
+    Local ATS analysis that only re-parses what changed between runs. Text is split into
+    sentence-ending segments, each parsed and tallied once and cached by content hash; a
+    re-check merges cached partials and parses only new segments. Skill phrases matched
+    on an earlier run are not re-scored either.
+
+    Counts, skills and every text check are identical to a whole-document run. Sentence
+    boundaries come from per-segment parses, so they can differ slightly from parsing the
+    document in one go.
+    """
+
+    def __init__(self, max_segments=SEGMENT_CACHE_SIZE, max_skill_matches=SKILL_MATCH_CACHE_SIZE):
+        self.max_segments = max_segments
+        self.max_skill_matches = max_skill_matches
+        self._segments = OrderedDict()
+        self._skill_matches = OrderedDict()
+        self._lexicon_version = None
+        # (segments in the last run, segments parsed for it)
+        self.last_run = (0, 0)
+
+    def _partials(self, segments):
+        keys = [segment_key(segment) for segment in segments]
+        missing = {key: segment for key, segment in zip(keys, segments) if key not in self._segments}
+
+        if missing:
+            docs = get_nlp().pipe(missing.values())
+            for (key, segment), doc in zip(missing.items(), docs):
+                self._segments[key] = analyze_segment(segment, doc)
+
+        partials = []
+        for key in keys:
+            self._segments.move_to_end(key)
+            partials.append(self._segments[key])
+        while len(self._segments) > self.max_segments:
+            self._segments.popitem(last=False)
+
+        self.last_run = (len(segments), len(missing))
+        return partials
+
+    def _trim_skill_matches(self, ngrams):
+        """Marks this run's phrases as recently used and evicts the least recently used beyond the cap."""
+        for phrase in ngrams:
+            if phrase in self._skill_matches: # Absent when the skills check was disabled
+                self._skill_matches.move_to_end(phrase)
+        while len(self._skill_matches) > self.max_skill_matches:
+            self._skill_matches.popitem(last=False)
+
+    def analyze(self, text, file_name, file_size, disabled=None):
+        """Same report as run_ats_report, reusing work from earlier calls on this analyzer."""
+        version = get_skill_registry().version
+        if version != self._lexicon_version:
+            # Cached skill matches belong to the lexicon they were scored against
+            self._skill_matches = OrderedDict()
+            self._lexicon_version = version
+
+        start = time.perf_counter()
+        partials = self._partials(split_segments(text))
+        tokens = [token for partial in partials for token in partial.tokens]
+        ngrams = ngrams_from_tokens(tokens)
+        segments_time = time.perf_counter() - start
+
+        inputs = CheckInputs(
+            text=text,
+            file_name=file_name,
+            file_size=file_size,
+            text_tallies=merge_tallies(partial.tallies for partial in partials),
+            sentence_scan=(
+                [s for partial in partials for s in partial.long_sentences],
+                [s for partial in partials for s in partial.passive_sentences],
+            ),
+            skill_ngrams=ngrams,
+            skill_match_cache=self._skill_matches,
+        )
+        report = run_ats_checks(inputs, disabled=disabled)
+        self._trim_skill_matches(ngrams)
+        report.input_timings["segments"] = segments_time
+        return report
+
+
+if __name__ == "__main__":
+    # Benchmark: full analysis vs an incremental re-check after editing one line of each resume
+    import sys
+    import os
+    from analyzer.resume_analysis import run_ats_report
+    from preprocessor.batch import find_resumes
+    from preprocessor.parser import extract_text_from_path
+
+    resume_dir = sys.argv[1] if len(sys.argv) > 1 else "data/resumes"
+    paths = find_resumes(resume_dir)
+    full_time = recheck_time = 0.0
+    for path in paths:
+        text = extract_text_from_path(path)
+        size = os.path.getsize(path)
+        edited = text.replace("Developed", "Built", 1) if "Developed" in text else text + "\nEdited."
+
+        start = time.perf_counter()
+        run_ats_report(edited, path, size)
+        full_time += time.perf_counter() - start
+
+        analyzer = IncrementalAtsAnalyzer()
+        analyzer.analyze(text, path, size)
+        start = time.perf_counter()
+        analyzer.analyze(edited, path, size)
+        recheck_time += time.perf_counter() - start
+        segments, parsed = analyzer.last_run
+        print(f"{os.path.basename(path)}: re-parsed {parsed} of {segments} segments")
+
+    print(f"full run {full_time / len(paths) * 1000:.1f} ms, incremental re-check {recheck_time / len(paths) * 1000:.1f} ms per resume")
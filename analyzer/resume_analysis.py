@@ -1,47 +1,154 @@
-import re
-from preprocessor.skills import extract_skills_fuzzy, extract_soft_skills_fuzzy
+from preprocessor.skills import get_ngrams, match_all_skill_ids
+from preprocessor.skill_registry import get_skill_registry
 from preprocessor.spacy_nlp import load_spacy_nlp_model
+import time
 from collections import Counter
+from analyzer.ats_checks import CheckInputs, ats_check, ats_input, run_ats_checks
+from analyzer.ats_rules import (
+    GENERIC_PHRASE_COUNTER, ACTION_VERB_PATTERN, PASSIVE_PATTERN, EMAIL_PATTERN, PHONE_PATTERN,
+    LINKEDIN_PATTERN, GRAMMAR_PATTERN, PRONOUN_PATTERN, METRIC_PATTERN, BULLET_PATTERN,
+    passive_sentence_mask
+)
 
-nlp = load_spacy_nlp_model("en_core_web_sm")
+ATS_MODEL = "en_core_web_sm"
 
-def run_local_ats_analysis(text, uploaded_file):
-    doc = nlp(text)
-    sections = []
 
-    # Step 1: Contact Information
-    email = re.search(r"[\w\.-]+@[\w\.-]+", text)
-    phone = re.search(r"\+?\d[\d\s\-]{7,15}", text)
-    linkedin = re.search(r"linkedin\.com/in/\S+", text)
-    section_1 = {
-        "step": 1,
-        "title": "Contact Information Check",
-        "findings": [],
+def get_nlp():
+    """The ATS spaCy pipeline, loaded on first use rather than at import."""
+    return load_spacy_nlp_model(ATS_MODEL)
+
+
+def warmup():
+    """Loads the spaCy model and skill lexicon now, so the first analysis does not pay for them."""
+    get_nlp()
+    get_skill_registry()
+
+
+# Shared inputs: base values are text, file_name and file_size; these derive from them
+
+@ats_input("nlp", requires=())
+def _nlp(inputs):
+    return get_nlp()
+
+
+@ats_input("text_lower")
+def _text_lower(inputs):
+    return inputs["text"].lower()
+
+
+@ats_input("doc", requires=("text", "nlp"))
+def _doc(inputs):
+    return inputs["nlp"](inputs["text"])
+
+
+@ats_input("sentences", requires=("doc",))
+def _sentences(inputs):
+    return list(inputs["doc"].sents)
+
+
+def passive_flags_from_regex(sentences):
+    return [bool(PASSIVE_PATTERN.search(sent.text)) for sent in sentences]
+
+
+def passive_flags(doc, sentences):
+    """Passive voice from the dependency parse; the auxiliary + participle regex if the pipeline has no parser."""
+    if doc.has_annotation("DEP"):
+        return passive_sentence_mask(doc, sentences)
+    return passive_flags_from_regex(sentences)
+
+
+def scan_sentences(doc, sentences):
+    """Long sentences and passive sentences, found in one pass (steps 5 and 7)."""
+    long_sents = []
+    passive_sentences = []
+    for sent, is_passive in zip(sentences, passive_flags(doc, sentences)):
+        if len(sent.text.split()) > 40:
+            long_sents.append(sent.text)
+        if is_passive:
+            passive_sentences.append(sent.text.strip())
+    return long_sents, passive_sentences
+
+
+def text_tallies(text):
+    """
+    Document-level counts behind steps 2, 3, 6, 8, 10 and 11. None of the patterns can match
+    across sentence-final punctuation, so tallies of pieces split there add up to the whole.
+    """
+    text_lower = text.lower()
+    return {
+        "word_count": len(text.split()),
+        "grammar_errors": len(GRAMMAR_PATTERN.findall(text)),
+        "pronouns": len(PRONOUN_PATTERN.findall(text)),
+        "metrics": len(METRIC_PATTERN.findall(text)),
+        "generic_phrases": Counter(GENERIC_PHRASE_COUNTER.count(text_lower)),
+        "action_verbs": Counter(match.group(0) for match in ACTION_VERB_PATTERN.finditer(text_lower)),
     }
-    section_1["findings"].append(("success", "Email detected") if email else ("warning", "No email found"))
-    section_1["findings"].append(("success", "Phone number detected") if phone else ("warning", "No phone number found"))
-    section_1["findings"].append(("success", "LinkedIn profile found") if linkedin else ("warning", "LinkedIn profile missing"))
-    sections.append(section_1)
-
-    # Step 2: Grammar (basic)
-    grammar_errors = re.findall(r"\b[A-Z][a-z]+ [a-z]+ [A-Z][a-z]+\b", text)
-    sections.append({
-        "step": 2,
-        "title": "Spelling & Grammar Check",
-        "findings": [("success", "No obvious grammar/spelling issues detected")] if len(grammar_errors) < 2 else [("warning", "Possible grammar or capitalization issues found")]
-    })
-
-    # Step 3: Personal Pronouns
-    personal_pronouns = re.findall(r"\b(I|me|my|mine|we|our)\b", text, re.IGNORECASE)
-    sections.append({
-        "step": 3,
-        "title": "Personal Pronoun Check",
-        "findings": [("success", "No personal pronouns used")] if not personal_pronouns else [("warning", f"{len(personal_pronouns)} personal pronouns found. Avoid them.")]
-    })
-
-    # Step 4: Skills & Keywords
-    tech_skills = extract_skills_fuzzy(doc)
-    soft_skills = extract_soft_skills_fuzzy(doc)
+
+
+def merge_tallies(tallies):
+    merged = {"word_count": 0, "grammar_errors": 0, "pronouns": 0, "metrics": 0, "generic_phrases": Counter(), "action_verbs": Counter()}
+    for tally in tallies:
+        for key, value in tally.items():
+            merged[key] += value
+    return merged
+
+
+@ats_input("sentence_scan", requires=("doc", "sentences"))
+def _sentence_scan(inputs):
+    return scan_sentences(inputs["doc"], inputs["sentences"])
+
+
+@ats_input("text_tallies")
+def _text_tallies(inputs):
+    return text_tallies(inputs["text"])
+
+
+@ats_input("skill_ngrams", requires=("doc",))
+def _skill_ngrams(inputs):
+    return get_ngrams(inputs["doc"])
+
+
+# Per-phrase match memo; only incremental re-analysis keeps one between runs
+@ats_input("skill_match_cache", requires=())
+def _skill_match_cache(inputs):
+    return None
+
+
+# Step 1: Contact Information
+@ats_check("contact", 1, "Contact Information Check")
+def check_contact(inputs):
+    text = inputs["text"]
+    email = EMAIL_PATTERN.search(text)
+    phone = PHONE_PATTERN.search(text)
+    linkedin = LINKEDIN_PATTERN.search(text)
+    return [
+        ("success", "Email detected") if email else ("warning", "No email found"),
+        ("success", "Phone number detected") if phone else ("warning", "No phone number found"),
+        ("success", "LinkedIn profile found") if linkedin else ("warning", "LinkedIn profile missing"),
+    ]
+
+
+# Step 2: Grammar (basic)
+@ats_check("grammar", 2, "Spelling & Grammar Check", requires=("text_tallies",))
+def check_grammar(inputs):
+    grammar_errors = inputs["text_tallies"]["grammar_errors"]
+    return [("success", "No obvious grammar/spelling issues detected")] if grammar_errors < 2 else [("warning", "Possible grammar or capitalization issues found")]
+
+
+# Step 3: Personal Pronouns
+@ats_check("pronouns", 3, "Personal Pronoun Check", requires=("text_tallies",))
+def check_pronouns(inputs):
+    personal_pronouns = inputs["text_tallies"]["pronouns"]
+    return [("success", "No personal pronouns used")] if not personal_pronouns else [("warning", f"{personal_pronouns} personal pronouns found. Avoid them.")]
+
+
+# Step 4: Skills & Keywords (fuzzy matching runs in rapidfuzz, off the GIL)
+@ats_check("skills", 4, "Skills & Keyword Targeting", requires=("skill_ngrams", "skill_match_cache"), concurrent=True)
+def check_skills(inputs):
+    registry = get_skill_registry()
+    hard_ids, soft_ids = match_all_skill_ids(inputs["skill_ngrams"], inputs["skill_match_cache"])
+    tech_skills = registry.skill_names_of(hard_ids)
+    soft_skills = registry.skill_names_of(soft_ids)
     findings = []
     if tech_skills:
         findings.append(("success", f"Detected Technical Skills: {', '.join(tech_skills)}"))
@@ -51,141 +158,76 @@ def run_local_ats_analysis(text, uploaded_file):
         findings.append(("success", f"Detected Soft Skills: {', '.join(soft_skills)}"))
     else:
         findings.append(("warning", f"Soft Skills not detected"))
-    sections.append({
-        "step": 4,
-        "title": "Skills & Keyword Targeting",
-        "findings": findings
-    })
-
-    # Step 5: Complex Sentences
-    long_sents = [sent.text for sent in doc.sents if len(sent.text.split()) > 40]
-    sections.append({
-        "step": 5,
-        "title": "Long Sentences",
-        "findings": [("warning", f"Long sentence: {s[:80]}...") for s in long_sents] if long_sents else [("success", "No long sentences found")]
-    })
-
-    
-    # Step 6: Generic Sentences
-    generic_phrases = [
-        "responsible for", "worked on", "helped", "tasked with", "participated in", "assisted with", "handled",
-        "involved in", "part of", "supported", "duties included", "played a role in", "knowledge of", "familiar with",
-        "exposure to", "experience in", "performed", "used to", "took part in", "made", "did", "contributed to", "led",
-        "managed", "oversaw", "ran", "coordinated", "scheduled", "organized", "arranged", "created", "built", "developed",
-        "designed", "engineered", "deployed", "launched", "implemented", "executed", "collaborated with", "worked closely with",
-        "worked as", "worked under", "followed up on", "took responsibility for", "supervised", "trained", "mentored",
-        "assumed responsibility for", "provided support", "provided assistance", "gave input on", "attended", "joined",
-        "contributed", "assumed the role of", "followed", "performed duties", "assigned to", "utilized", "used",
-        "applied knowledge of", "leveraged", "made sure", "ensured", "ensured compliance", "validated", "checked",
-        "verified", "responded to", "answered", "dealt with", "addressed", "resolved", "fixed", "improved", "streamlined",
-        "upgraded", "enhanced", "maintained", "supported users", "gave feedback", "filled in", "acted as", "liaised with",
-        "followed procedures", "enforced policies", "interfaced with", "contributed ideas", "wrote", "edited", "documented",
-        "reported on", "compiled", "tracked", "monitored", "recorded", "calculated", "evaluated", "tested", "analyzed data",
-        "reviewed", "produced", "submitted"
-    ]
+    return findings
 
-    text_lower = text.lower()
-    phrase_counter = Counter()
 
-    for phrase in generic_phrases:
-        count = text_lower.count(phrase)
-        if count > 2:
-            phrase_counter[phrase] = count
+# Step 5: Complex Sentences
+@ats_check("long_sentences", 5, "Long Sentences", requires=("sentence_scan",))
+def check_long_sentences(inputs):
+    long_sents, _ = inputs["sentence_scan"]
+    return [("warning", f"Long sentence: {s[:80]}...") for s in long_sents] if long_sents else [("success", "No long sentences found")]
 
+
+# Step 6: Generic Sentences
+@ats_check("generic_phrases", 6, "Generic Sentences", requires=("text_tallies",))
+def check_generic_phrases(inputs):
+    counts = inputs["text_tallies"]["generic_phrases"]
+    # Reported in lexicon order
+    phrase_counter = {
+        phrase: counts[phrase] for phrase in GENERIC_PHRASE_COUNTER.phrases
+        if counts[phrase] > 2
+    }
     if phrase_counter:
-        findings = [
+        return [
             ("warning", f"Generic phrase used: '{phrase}' — {count} times")
             for phrase, count in phrase_counter.items()
         ]
-    else:
-        findings = [("success", "No overused generic phrases found")]
-
-    sections.append({
-        "step": 6,
-        "title": "Generic Sentences",
-        "findings": findings
-    })
-
-    # Step 7: Passive Voice
-    passive_indicators = [
-        "was", "were", "is", "are", "been", "being", "be",
-        "has been", "have been", "had been",
-        "will be", "would be", "shall be", "should be", "can be", "could be", "may be", "might be", "must be"
-    ]
-    passive_patterns = [
-    re.compile(rf"\b{aux}\b\s+\b\w+(ed|en)\b", re.IGNORECASE) for aux in passive_indicators
-    ]
+    return [("success", "No overused generic phrases found")]
 
-    passive_sentences = []
-    for sent in doc.sents:
-        for pattern in passive_patterns:
-            if pattern.search(sent.text):
-                passive_sentences.append(sent.text.strip())
-                break
-
-    sections.append({
-        "step": 7,
-        "title": "Passive Sentences",
-        "findings": [("warning", f"Passive: {p[:80]}...") for p in passive_sentences] if passive_sentences else [("success", "No passive voice detected")]
-    })
-
-    # Step 8: Quantified Achievements
-    metrics = re.findall(r"\d+%|\d{2,}", text)
-    sections.append({
-        "step": 8,
-        "title": "Quantified Points",
-        "findings": [("success", f"{len(metrics)} quantified results found")] if metrics else [("warning", "No quantified achievements (%, numbers) found")]
-    })
-
-    # Step 9: Essential Resume Sections
-    required_sections = ["summary", "education", "experience", "skills"]
-    missing_sections = [s for s in required_sections if s not in text.lower()]
-    sections.append({
-        "step": 9,
-        "title": "Essential Resume Sections",
-        "findings": [("warning", f"Missing section: {', '.join(missing_sections)}")] if missing_sections else [("success", "All essential sections found")]
-    })
-
-    # Step 10: Repeated Action Verbs
-    action_verb_list = [
-        "achieved", "administered", "analyzed", "arranged", "built", "calculated", "collaborated", "communicated",
-        "completed", "conducted", "created", "debugged", "designed", "developed", "directed", "documented", "enhanced",
-        "engineered", "executed", "facilitated", "formulated", "generated", "handled", "implemented", "improved",
-        "initiated", "inspired", "integrated", "led", "managed", "monitored", "negotiated", "organized", "oversaw",
-        "performed", "planned", "presented", "programmed", "provided", "redesigned", "researched", "resolved", "reviewed",
-        "scheduled", "solved", "streamlined", "supervised", "supported", "tested", "trained", "translated", "upgraded",
-        "utilized", "validated", "wrote"
-    ]
 
-    action_verb_counter = Counter()
-    text_tokens = re.findall(r"\b\w+\b", text.lower())
+# Step 7: Passive Voice
+@ats_check("passive_voice", 7, "Passive Sentences", requires=("sentence_scan",))
+def check_passive_voice(inputs):
+    _, passive_sentences = inputs["sentence_scan"]
+    return [("warning", f"Passive: {p[:80]}...") for p in passive_sentences] if passive_sentences else [("success", "No passive voice detected")]
 
-    for token in text_tokens:
-        if token in action_verb_list:
-            action_verb_counter[token] += 1
 
-    overused_verbs = {verb: count for verb, count in action_verb_counter.items() if count > 2}
+# Step 8: Quantified Achievements
+@ats_check("metrics", 8, "Quantified Points", requires=("text_tallies",))
+def check_metrics(inputs):
+    metrics = inputs["text_tallies"]["metrics"]
+    return [("success", f"{metrics} quantified results found")] if metrics else [("warning", "No quantified achievements (%, numbers) found")]
+
+
+# Step 9: Essential Resume Sections
+@ats_check("sections", 9, "Essential Resume Sections", requires=("text_lower",))
+def check_sections(inputs):
+    required_sections = ["summary", "education", "experience", "skills"]
+    missing_sections = [s for s in required_sections if s not in inputs["text_lower"]]
+    return [("warning", f"Missing section: {', '.join(missing_sections)}")] if missing_sections else [("success", "All essential sections found")]
 
+
+# Step 10: Repeated Action Verbs
+@ats_check("action_verbs", 10, "Repeated Action Verbs", requires=("text_tallies",))
+def check_action_verbs(inputs):
+    action_verb_counter = inputs["text_tallies"]["action_verbs"]
+    overused_verbs = {verb: count for verb, count in action_verb_counter.items() if count > 2}
     if overused_verbs:
-        findings = [
+        return [
             ("warning", f"Repeated action verb: '{verb}' used {count} times")
             for verb, count in overused_verbs.items()
         ]
-    else:
-        findings = [("success", "No repetitive action verbs")]
+    return [("success", "No repetitive action verbs")]
 
-    sections.append({
-        "step": 10,
-        "title": "Repeated Action Verbs",
-        "findings": findings
-    })
 
-
-    # Step 11: Document Properties
+# Step 11: Document Properties
+@ats_check("document", 11, "Document Properties", requires=("text_tallies", "file_name", "file_size"))
+def check_document(inputs):
     findings = []
+    file_name, file_size = inputs["file_name"], inputs["file_size"]
 
     # Word Count Check
-    word_count = len(text.split())
+    word_count = inputs["text_tallies"]["word_count"]
     if word_count <= 350:
         findings.append(("warning", f"Resume too short: {word_count} words. Aim for 350–600."))
     elif word_count > 900:
@@ -194,30 +236,119 @@ def run_local_ats_analysis(text, uploaded_file):
         findings.append(("success", f"Good resume length: {word_count} words."))
 
     # File Type Check
-    if not uploaded_file.name.lower().endswith(".pdf"):
+    if not file_name.lower().endswith(".pdf"):
         findings.append(("warning", "Resume is not in PDF format. Use PDF for better ATS compatibility."))
     else:
         findings.append(("success", "PDF format detected. ATS-friendly!"))
 
     # File Size Check
-    if uploaded_file.size > 2 * 1024 * 1024:  # 2MB = 2 * 1024 * 1024 bytes
-        findings.append(("warning", f"File size is too large: {round(uploaded_file.size / (1024*1024), 2)} MB. Reduce to under 2MB."))
+    if file_size > 2 * 1024 * 1024:  # 2MB = 2 * 1024 * 1024 bytes
+        findings.append(("warning", f"File size is too large: {round(file_size / (1024*1024), 2)} MB. Reduce to under 2MB."))
+    else:
+        findings.append(("success", f"Good file size: {round(file_size / 1024, 1)} KB."))
+    return findings
+
+
+# Step 12: Formatting Consistency
+@ats_check("formatting", 12, "Formatting Consistency")
+def check_formatting(inputs):
+    inconsistent_bullets = BULLET_PATTERN.findall(inputs["text"])
+    return [("warning", "Bullet formatting may be inconsistent. Kindly verify")] if len(inconsistent_bullets) > 5 else [("success", "Formatting looks consistent")]
+
+
+def run_ats_report(text, file_name, file_size, disabled=None):
+    """All enabled local ATS checks, with per-check and per-input wall times."""
+    inputs = CheckInputs(text=text, file_name=file_name, file_size=file_size)
+    return run_ats_checks(inputs, disabled=disabled)
+
+
+def run_local_ats_analysis(text, file_name, file_size):
+    """Sections for the ATS page: the report without timings. Needs only the file's name and size in bytes."""
+    return run_ats_report(text, file_name, file_size).sections
+
+
+def compare_passive_detectors(texts):
+    """
+    Regex vs dependency-parse passive detection over already-parsed resumes.
+    Returns total seconds for each detector and how many sentences each one flags.
+    """
+    regex_time = parse_time = 0.0
+    both = regex_only = parse_only = 0
+    nlp = get_nlp()
+    for text in texts:
+        doc = nlp(text)
+        sentences = list(doc.sents)
+
+        start = time.perf_counter()
+        by_regex = passive_flags_from_regex(sentences)
+        regex_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        by_parse = passive_sentence_mask(doc, sentences)
+        parse_time += time.perf_counter() - start
+
+        for r, p in zip(by_regex, by_parse):
+            both += r and p
+            regex_only += r and not p
+            parse_only += p and not r
+    return {"regex_s": regex_time, "parse_s": parse_time, "both": both, "regex_only": regex_only, "parse_only": parse_only}
+
+
+def measure_import(modules, warm=False):
+    """
+    Imports `modules` in a fresh interpreter and returns (import seconds, heavy libraries that got
+    imported as a comma-separated string, warmup seconds). The warmup time is that of calling
+    warmup() afterwards when `warm` is set, else None.
+    """
+    import subprocess
+    import sys
+    code = (
+        "import sys, time\n"
+        "start = time.perf_counter()\n"
+        + "".join(f"import {module}\n" for module in modules)
+        + "print('@', time.perf_counter() - start)\n"
+        "print('@', ','.join(m for m in ('spacy', 'google.generativeai') if m in sys.modules))\n"
+    )
+    if warm:
+        code += "start = time.perf_counter()\nimport analyzer.resume_analysis as ra\nra.warmup()\nprint('@', time.perf_counter() - start)\n"
+    stdout = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    # Libraries may print their own warnings; the benchmark's lines are tagged with "@"
+    out = [line[2:] for line in stdout.splitlines() if line.startswith("@ ")]
+    return float(out[0]), out[1], float(out[2]) if warm else None
+
+
+if __name__ == "__main__":
+    # Latency profile: mean wall time per check and shared input over a folder of resumes
+    import argparse
+    import os
+    from preprocessor.batch import find_resumes
+    from preprocessor.parser import extract_text_from_path
+
+    arg_parser = argparse.ArgumentParser(description="Profile the local ATS checks over a folder of resumes.")
+    arg_parser.add_argument("resume_dir", nargs="?", default="data/resumes")
+    arg_parser.add_argument("--compare-passive", action="store_true", help="Benchmark regex vs dependency-parse passive detection")
+    arg_parser.add_argument("--import-time", action="store_true", help="Time a cold import of the analyzer and preprocessor modules, then warmup()")
+    args = arg_parser.parse_args()
+
+    if args.import_time:
+        modules = ["analyzer.resume_analysis", "analyzer.analysis_enhancer", "preprocessor.skills", "preprocessor.parser", "preprocessor.personal_info"]
+        import_s, heavy, warm_s = measure_import(modules, warm=True)
+        print(f"import: {import_s * 1000:.0f} ms (heavy libraries loaded: {heavy or 'none'})")
+        print(f"warmup(): {warm_s * 1000:.0f} ms")
+        raise SystemExit
+
+    paths = find_resumes(args.resume_dir)
+    texts = [extract_text_from_path(path) for path in paths]
+
+    if args.compare_passive:
+        stats = compare_passive_detectors(texts)
+        print(f"regex: {stats['regex_s'] * 1000:.2f} ms, parse: {stats['parse_s'] * 1000:.2f} ms over {len(texts)} resumes")
+        print(f"passive sentences: {stats['both']} flagged by both, {stats['regex_only']} regex only, {stats['parse_only']} parse only")
     else:
-        findings.append(("success", f"Good file size: {round(uploaded_file.size / 1024, 1)} KB."))
-
-    sections.append({
-        "step": 11,
-        "title": "Document Properties",
-        "findings": findings
-    })
-
-    # Step 12: Formatting Consistency
-    inconsistent_bullets = re.findall(r"\n[^\n•\-–●\*]", text)
-    findings = [("warning", "Bullet formatting may be inconsistent. Kindly verify")] if len(inconsistent_bullets) > 5 else [("success", "Formatting looks consistent")]
-    sections.append({
-        "step": 12,
-        "title": "Formatting Consistency",
-        "findings": findings
-    })
-
-    return sections
\ No newline at end of file
+        totals = Counter()
+        for path, text in zip(paths, texts):
+            report = run_ats_report(text, path, os.path.getsize(path))
+            totals.update({f"check {name}": t for name, t in report.check_timings.items()})
+            totals.update({f"input {name}": t for name, t in report.input_timings.items()})
+        for name, total in totals.most_common():
+            print(f"{total / len(paths) * 1000:8.2f} ms  {name}")
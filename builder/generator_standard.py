@@ -5,19 +5,45 @@ from docx.oxml.ns import qn
 from docx.oxml import OxmlElement
 from docx.opc.constants import RELATIONSHIP_TYPE as RT
 from docx.enum.style import WD_STYLE_TYPE
+import copy
 import io
+import os
 import re # Import re module for URL cleaning
+import threading
+import weakref
 
-# Stores the calculated right margin end for consistent tab stop placement
-global_margin_end = None
+# Prepared base documents (template parsed, default styles applied, saved) per template path,
+# as (template mtime, docx bytes); every render clones one instead of setting it up again
+_base_documents = {}
+_base_documents_lock = threading.Lock()
+
+# Styles the sections use by name; a template without them gets python-docx's default definitions
+REQUIRED_STYLES = ('List Bullet',)
+
+# Values resolved once per document (tab stop position, style ids), keyed by its document part
+_document_layouts = weakref.WeakKeyDictionary()
+_document_layouts_lock = threading.Lock()
+
+def _document_layout(doc):
+    """The per-document cache of resolved layout values."""
+    with _document_layouts_lock:
+        return _document_layouts.setdefault(doc.part, {})
 
 def _calculate_margin_end(doc):
     """Calculates the right edge of the content area within the document's margins."""
-    global global_margin_end
-    if global_margin_end is None:
+    layout = _document_layout(doc)
+    if "margin_end" not in layout:
         section = doc.sections[0]
-        global_margin_end = Inches(section.page_width.inches - (section.left_margin.inches + section.right_margin.inches))
-    return global_margin_end
+        layout["margin_end"] = Inches(section.page_width.inches - (section.left_margin.inches + section.right_margin.inches))
+    return layout["margin_end"]
+
+def _style_id(doc, style_name, style_type):
+    """Resolves a style name to its id once per document; python-docx otherwise scans every style on each use."""
+    layout = _document_layout(doc)
+    key = ("style_id", style_name)
+    if key not in layout:
+        layout[key] = doc.styles.get_style_id(style_name, style_type)
+    return layout[key]
 
 def _set_default_font_style(doc):
     """Configures the 'Normal' style's default font to Cambria 10pt and sets single line spacing."""
@@ -80,6 +106,13 @@ def _get_or_create_hyperlink_style(d):
 
     return "Hyperlink"
 
+def _hyperlink_style_id(d):
+    """The 'Hyperlink' style id, ensured and resolved once per document."""
+    layout = _document_layout(d)
+    if "hyperlink_style_id" not in layout:
+        layout["hyperlink_style_id"] = _style_id(d, _get_or_create_hyperlink_style(d), WD_STYLE_TYPE.CHARACTER)
+    return layout["hyperlink_style_id"]
+
 def _add_hyperlink(doc_obj, paragraph, url, text, size=10):
     """
     Adds a clickable hyperlink to a given paragraph with specified text and font size.
@@ -101,7 +134,7 @@ def _add_hyperlink(doc_obj, paragraph, url, text, size=10):
     new_run = paragraph.add_run(text)
     
     # Applies the 'Hyperlink' style to the run, setting its default appearance (blue, underlined).
-    new_run.style = _get_or_create_hyperlink_style(doc_obj)
+    new_run._r.style = _hyperlink_style_id(doc_obj)
 
     # Overrides or ensures specific font properties for consistency.
     new_run.font.size = Pt(size)
@@ -182,7 +215,8 @@ def _add_left_right_paragraph(doc_obj, left_content, right_display_text, right_u
 
 def _add_bullet_point(doc_obj, text):
     """Adds a single bullet point paragraph with Cambria 10pt font."""
-    p = doc_obj.add_paragraph(text, style='List Bullet') # Uses the built-in 'List Bullet' style
+    p = doc_obj.add_paragraph(text)
+    p._p.style = _style_id(doc_obj, 'List Bullet', WD_STYLE_TYPE.PARAGRAPH) # Uses the built-in 'List Bullet' style
     p.paragraph_format.left_indent = Inches(0.25) # Indents the bullet point
     p.paragraph_format.first_line_indent = Inches(-0.25) # Pulls the bullet symbol left
     p.paragraph_format.space_after = Pt(2) # Minimal vertical spacing after
@@ -407,7 +441,8 @@ def add_work_experience_section(doc, experiences):
             for desc in responsibilities_list:
                 if desc: # Check again after stripping
                     if "O(n²)" in desc or "O(n log n)" in desc:
-                        p = doc.add_paragraph(style='List Bullet')
+                        p = doc.add_paragraph()
+                        p._p.style = _style_id(doc, 'List Bullet', WD_STYLE_TYPE.PARAGRAPH)
                         p.paragraph_format.left_indent = Inches(0.25)
                         p.paragraph_format.first_line_indent = Inches(-0.25)
                         p.paragraph_format.space_after = Pt(2)
@@ -555,15 +590,89 @@ def add_hobbies_section(doc, hobbies):
             p.runs[0].font.size = Pt(10)
             p.runs[0].font.name = 'Cambria'
 
-def generate_structured_resume(data, template_path=None):
+def _copy_numbering(source, doc, num_id):
+    """Copies numbering definition `num_id` (and its abstract definition) from `source` into `doc` → its new numId."""
+    source_numbering = source.part.numbering_part.element
+    numbering = doc.part.numbering_part.element
+    abstract_id = source_numbering.num_having_numId(num_id).abstractNumId.val
+
+    abstract = copy.deepcopy(next(
+        a for a in source_numbering.findall(qn('w:abstractNum')) if a.get(qn('w:abstractNumId')) == str(abstract_id)
+    ))
+    used_ids = [int(a.get(qn('w:abstractNumId'))) for a in numbering.findall(qn('w:abstractNum'))]
+    new_abstract_id = max(used_ids, default=-1) + 1
+    abstract.set(qn('w:abstractNumId'), str(new_abstract_id))
+    # Abstract definitions come before the <w:num> entries that use them
+    first_num = numbering.find(qn('w:num'))
+    if first_num is not None:
+        first_num.addprevious(abstract)
+    else:
+        numbering.append(abstract)
+    return numbering.add_num(new_abstract_id).numId
+
+def _copy_missing_styles(doc):
+    """Adds the REQUIRED_STYLES `doc` lacks, copied from python-docx's default document with any bullet numbering they use."""
+    missing = [name for name in REQUIRED_STYLES if name not in doc.styles]
+    if not missing:
+        return
+    default = Document()
+    for name in missing:
+        style = copy.deepcopy(default.styles[name].element)
+        based_on = style.find(qn('w:basedOn'))
+        if based_on is not None and doc.styles.element.get_by_id(based_on.get(qn('w:val'))) is None:
+            style.remove(based_on)
+        num_id = style.find('.//' + qn('w:numId'))
+        if num_id is not None:
+            num_id.set(qn('w:val'), str(_copy_numbering(default, doc, int(num_id.get(qn('w:val'))))))
+        doc.styles.element.append(style)
+
+def _prepare_base_document(template_path):
     """
-    Generates a complete resume document in DOCX format based on the provided structured data.
+    Builds the document every render starts from: the template (or python-docx's default)
+    with its body emptied, default font and spacing applied, and the 'Hyperlink' style and
+    REQUIRED_STYLES in place. A template those styles cannot be added to (it has no numbering
+    part) is replaced by python-docx's default document. Returns it saved as DOCX bytes.
     """
-    doc = Document()
+    doc = Document(template_path)
+    try:
+        _copy_missing_styles(doc)
+    except NotImplementedError: # python-docx cannot create a numbering part from scratch
+        doc = Document()
+    body = doc.element.body
+    for child in list(body):
+        if child.tag != qn('w:sectPr'): # Keeps the page size and margins
+            body.remove(child)
 
     # Initializes document-wide default font and line spacing for consistency.
     _set_default_font_style(doc)
-    _calculate_margin_end(doc) # Calculates the content area width for tab stops
+    _get_or_create_hyperlink_style(doc)
+
+    bio = io.BytesIO()
+    doc.save(bio)
+    return bio.getvalue()
+
+def new_resume_document(template_path=None):
+    """
+    Returns a fresh document for one render, cloned in memory from the prepared base for
+    `template_path`. The base is prepared once and again only when the template file changes;
+    a missing template falls back to python-docx's default document.
+    """
+    if template_path and not os.path.isfile(template_path):
+        template_path = None
+    mtime = os.path.getmtime(template_path) if template_path else None
+
+    with _base_documents_lock:
+        cached = _base_documents.get(template_path)
+        if cached is None or cached[0] != mtime:
+            cached = _base_documents[template_path] = (mtime, _prepare_base_document(template_path))
+    return Document(io.BytesIO(cached[1]))
+
+def generate_structured_resume(data, template_path=None):
+    """
+    Generates a complete resume document in DOCX format based on the provided structured data,
+    starting from `template_path` (its styles and page setup) when that file exists.
+    """
+    doc = new_resume_document(template_path)
 
     # Extracts data from the input dictionary for easier access.
     personal = data['personal']
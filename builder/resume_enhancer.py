@@ -1,7 +1,65 @@
 import streamlit as st
-import google.generativeai as genai
 import os
 import re
+import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from llm.response_cache import cached_generate
+from llm.backends import get_backend
+from llm.model_resolution import get_model_resolver
+from llm.resilience import call_llm, CircuitOpenError
+from llm.quota import QuotaExceededError
+
+# Bump whenever generate_prompt changes, so answers cached for the old prompts are not reused
+ENHANCE_PROMPT_VERSION = "enhance-v1"
+
+# Sections in flight at once
+ENHANCE_WORKERS = 4
+
+# Bump whenever the batched prompt, rules or schema change
+BATCH_PROMPT_VERSION = "enhance-batch-v1"
+
+# Ordered list of preferred text-generation models
+PREFERRED_GEMINI_MODELS = [
+    "gemini-2.5-flash",              #  Best balance of quality, speed, and cost
+    "gemini-1.5-flash-8b",           #  Budget-friendly small model with good capabilities
+    "gemini-2.0-flash",              #  Stable, older but still versatile
+    "gemini-2.0-flash-lite",         #  Lightweight fallback for quota-limited use
+    "gemini-1.5-flash-latest"
+]
+
+# Bump whenever choose_gemini_model's preferences change, so stored model choices are re-resolved
+MODEL_PREFERENCE_VERSION = "models-v1"
+
+SAFETY_SETTINGS = {
+    'HARASSMENT': 'BLOCK_NONE',
+    'HATE': 'BLOCK_NONE',
+    'SEXUAL': 'BLOCK_NONE',
+    'DANGEROUS': 'BLOCK_NONE'
+}
+
+# Per-section rules for the batched request, sent once per section type rather than once per section
+SECTION_RULES = {
+    "professional summary": "A professional summary of 30 to 70 words.",
+    "job responsibility": "At most 3 bullet points, one per line, no bullet symbols or headers. Each starts with a strong action verb and shows quantifiable impact; estimate reasonable numbers (e.g. 'reduced errors by 15%') if none are given.",
+    "project description": "At most 3 bullet points, one per line, no bullet symbols or headers. Each starts with a strong action verb and highlights contributions and results; estimate reasonable numbers (e.g. 'handled 500+ users') if none are given.",
+    "skills section": "Exactly two lines: 'Technical Skills: ' then a comma-separated list, and 'Soft Skills: ' then a comma-separated list. Categorize the given skills, drop duplicates and add closely connected skills. Leave a category blank after the colon if it has none.",
+    "achievements": "Concise, keyword-rich achievement sentences with quantifiable results where possible, separated by commas, with no introduction or conclusion.",
+}
+
+BATCH_RESPONSE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "sections": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"id": {"type": "integer"}, "text": {"type": "string"}},
+                "required": ["id", "text"],
+            },
+        },
+    },
+    "required": ["sections"],
+}
 
 # Function to get API key from Streamlit secrets or user input
 def get_gemini_api_key():
@@ -36,42 +94,21 @@ def get_gemini_api_key():
         )
     return st.session_state.gemini_api_key
 
-@st.cache_data(ttl=3600) # Cache the model list for an hour
 def list_available_gemini_models(api_key):
-    """Lists available Gemini models that support generateContent."""
+    """Lists available Gemini models that support generateContent. Errors are raised to the caller."""
     if not api_key:
         return []
-    try:
-        genai.configure(api_key=api_key)
-        models = [m for m in genai.list_models() if 'generateContent' in m.supported_generation_methods]
-        
-        return models
-    except Exception as e:
-        if "API key not valid" not in str(e) and "Authentication error" not in str(e) and api_key:
-            st.error(f"Error listing Gemini models: {e}. This might indicate a problem with your API key or network.")
-        return []
+    return [m for m in get_backend(api_key).list_models() if 'generateContent' in m.supported_generation_methods]
 
-def get_suitable_gemini_model(api_key):
+def choose_gemini_model(available_models):
     """
-    Finds a suitable Gemini model for text generation, preferring newer and non-vision specific models.
+    Picks a suitable Gemini model for text generation, preferring newer and non-vision specific models.
     """
-    available_models = list_available_gemini_models(api_key)
-    
     if not available_models:
         return None
 
-    # Ordered list of preferred text-generation models
-    preferred_models_order = [
-        "gemini-2.5-flash",              #  Best balance of quality, speed, and cost
-        "gemini-1.5-flash-8b",           #  Budget-friendly small model with good capabilities
-        "gemini-2.0-flash",              #  Stable, older but still versatile
-        "gemini-2.0-flash-lite",         #  Lightweight fallback for quota-limited use
-        "gemini-1.5-flash-latest"
-    ]
-
-    
     selected_model = None
-    for preferred_model_name in preferred_models_order:
+    for preferred_model_name in PREFERRED_GEMINI_MODELS:
         for model in available_models:
             if model.name == preferred_model_name or model.name == f"models/{preferred_model_name}":
                 selected_model = model.name
@@ -106,6 +143,36 @@ def get_suitable_gemini_model(api_key):
 
     return None
 
+def get_suitable_gemini_model(api_key):
+    """
+    The model to use for `api_key`. The choice is resolved once and remembered across
+    sessions and restarts, and refreshed in the background, so models are not listed per call.
+    """
+    if not api_key:
+        return None
+    try:
+        return get_model_resolver().resolve(
+            api_key, lambda: choose_gemini_model(list_available_gemini_models(api_key)), MODEL_PREFERENCE_VERSION
+        )
+    except Exception as e:
+        if "API key not valid" not in str(e) and "Authentication error" not in str(e):
+            st.error(f"Error listing Gemini models: {e}. This might indicate a problem with your API key or network.")
+        return None
+
+def fallback_gemini_model(model_name):
+    """The next preferred model after `model_name`, used to hedge slow requests; None past the end."""
+    name = model_name.split("/")[-1]
+    if name not in PREFERRED_GEMINI_MODELS:
+        return None
+    following = PREFERRED_GEMINI_MODELS[PREFERRED_GEMINI_MODELS.index(name) + 1:]
+    return f"models/{following[0]}" if following else None
+
+def forget_gemini_model_if_missing(error, api_key):
+    """Drops the remembered model after a "not found" error, so the next call resolves a new one."""
+    error_message = str(error)
+    if "404" in error_message or "not found" in error_message.lower():
+        get_model_resolver().forget(api_key, MODEL_PREFERENCE_VERSION)
+
 def generate_prompt(section_name, text_content, tone="Professional"):
     """
     Generates a tailored prompt for Gemini based on the section and desired tone.
@@ -129,9 +196,47 @@ def generate_prompt(section_name, text_content, tone="Professional"):
         return f"{base_prompt}\n\nHere is the content:\n{text_content}\n\nEnhanced Content:"
 
 
-def enhance_content_with_gemini(section_name, text_content, tone, api_key):
+def gemini_error_message(error, section_name, model_name):
+    """User-facing explanation of a failed Gemini call."""
+    error_message = str(error)
+    if isinstance(error, QuotaExceededError):
+        return f"🚨 {error} {section_name} keeps its original content."
+    elif isinstance(error, CircuitOpenError):
+        return f"🚨 Gemini is not responding right now, so {section_name} keeps its original content. {error}"
+    elif "API key not valid" in error_message or "Authentication error" in error_message:
+        return "🚨 Gemini API Key Invalid: Please check your API key and try again."
+    elif "quota" in error_message or "rate limit" in error_message:
+        return "🚨 Gemini API Quota Exceeded or Rate Limited: You've hit your usage limits. Please wait a few minutes and try again, or check your usage on [Google AI Studio](https://makersuite.google.com/app/apikey)."
+    elif "404" in error_message and "models/" in error_message:
+        return f"🚨 Gemini Model Not Found or Not Supported: The model '{model_name}' might be unavailable or deprecated for your API key. Please try regenerating to select another suitable model or check Google AI Studio for available models."
+    return f"🚨 An unexpected error occurred during AI enhancement for {section_name}: {error}"
+
+
+def enhance_section(section_name, text_content, tone, api_key, model_name, bypass_cache=False, usage=None):
+    """
+    One Gemini enhancement with no Streamlit calls, so it can run on worker threads.
+    Returns the enhanced text, or None for an empty answer; API errors are raised.
+    Cache hits return without using the key's quota (or adding to `usage`, see call_llm).
+    """
+    def generate():
+        prompt = generate_prompt(section_name, text_content, tone)
+        
+        enhanced_text = call_llm(
+            api_key, model_name, prompt, fallback_model=fallback_gemini_model(model_name),
+            safety_settings=SAFETY_SETTINGS, usage=usage,
+        )
+        
+        return enhanced_text.strip() or None # Empty answers are not cached
+
+    return cached_generate(
+        model_name, ENHANCE_PROMPT_VERSION, (section_name, tone, text_content), generate, bypass=bypass_cache
+    )
+
+
+def enhance_content_with_gemini(section_name, text_content, tone, api_key, bypass_cache=False):
     """
     Sends content to Google Gemini for enhancement.
+    Answers are cached on disk by model, prompt version, section, tone and normalized text.
     """
     if not api_key:
         st.error("Gemini API key is not provided. Please enter your API key to use AI enhancement.")
@@ -143,39 +248,181 @@ def enhance_content_with_gemini(section_name, text_content, tone, api_key):
         return text_content
 
     try:
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel(model_name)
-        
-        prompt = generate_prompt(section_name, text_content, tone)
-        
-        response = model.generate_content(
-            prompt,
-            safety_settings={
-                'HARASSMENT': 'BLOCK_NONE',
-                'HATE': 'BLOCK_NONE',
-                'SEXUAL': 'BLOCK_NONE',
-                'DANGEROUS': 'BLOCK_NONE'
-            }
-        )
-        
-        if response and response.parts:
-            enhanced_text = ""
-            for part in response.parts:
-                if hasattr(part, 'text'):
-                    enhanced_text += part.text
-            return enhanced_text.strip()
-        else:
+        enhanced_text = enhance_section(section_name, text_content, tone, api_key, model_name, bypass_cache)
+        if enhanced_text is None:
             st.warning(f"AI enhancement returned an empty or unexpected response for {section_name}. Using original content.")
             return text_content
+        return enhanced_text
+    except Exception as e:
+        forget_gemini_model_if_missing(e, api_key)
+        st.error(gemini_error_message(e, section_name, model_name))
+        return text_content
+
+
+NO_API_KEY_PROBLEM = ("error", "Gemini API key is not provided. Please enter your API key to use AI enhancement.")
+NO_MODEL_PROBLEM = ("error", "No suitable Gemini model found for generation with your API key. Please check available models on Google AI Studio.")
 
+
+def unenhanced_sections(sections, problem, on_progress=None):
+    """Every section keeps its original text with the same `problem`; `on_progress` sees them all finish at once."""
+    if on_progress:
+        on_progress(len(sections), len(sections), "all sections")
+    return [(text, problem) for _, text in sections]
+
+
+def enhance_sections(sections, tone, api_key, bypass_cache=False, on_progress=None, max_workers=ENHANCE_WORKERS, usage=None, model_name=None):
+    """
+    Enhances many (section_name, text) pairs concurrently, paced by the key's quota governor.
+    Returns [(text, problem)] in input order, where text falls back to the original on failure and
+    problem is None or a ("warning" | "error", message) pair for the page to show.
+    `on_progress(done, total, section_name)` is called on the calling thread as sections finish.
+    A `usage` dict, if given, accumulates the estimated tokens of every request sent.
+    `model_name` skips model resolution when the caller has already resolved one.
+    """
+    if not sections:
+        return []
+    if not api_key:
+        return unenhanced_sections(sections, NO_API_KEY_PROBLEM, on_progress)
+
+    # Resolved once, up front, instead of once per section
+    model_name = model_name or get_suitable_gemini_model(api_key)
+    if not model_name:
+        return unenhanced_sections(sections, NO_MODEL_PROBLEM, on_progress)
+
+    results = [None] * len(sections)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            pool.submit(enhance_section, section_name, text, tone, api_key, model_name, bypass_cache, usage): i
+            for i, (section_name, text) in enumerate(sections)
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            i = futures[future]
+            section_name, text = sections[i]
+            try:
+                enhanced_text = future.result()
+                if enhanced_text is None:
+                    results[i] = (text, ("warning", f"AI enhancement returned an empty or unexpected response for {section_name}. Using original content."))
+                else:
+                    results[i] = (enhanced_text, None)
+            except Exception as e:
+                forget_gemini_model_if_missing(e, api_key)
+                results[i] = (text, ("error", gemini_error_message(e, section_name, model_name)))
+            if on_progress:
+                on_progress(done, len(sections), section_name)
+
+    return results
+
+
+def build_batch_prompt(sections, tone):
+    """One prompt for every (section_name, text) pair; shared instructions and rules appear once."""
+    rules = {name: SECTION_RULES.get(name, "Rewrite the content.") for name in dict.fromkeys(name for name, _ in sections)}
+    items = [{"id": i, "section": name, "content": text} for i, (name, text) in enumerate(sections)]
+    return (
+        f"As an expert resume writer, rewrite each resume section below to be highly impactful, concise and "
+        f"ATS-friendly, using a {tone} tone. Focus on achievements, quantifiable results and strong action verbs. "
+        f"Avoid generic statements and focus on unique contributions. Use plain text with no markdown.\n\n"
+        f"Rules per section type:\n{json.dumps(rules, indent=1)}\n\n"
+        f"Sections:\n{json.dumps(items, indent=1)}\n\n"
+        f'Return JSON {{"sections": [{{"id": <id>, "text": <rewritten section>}}]}} with one entry per section id.'
+    )
+
+
+def validate_enhanced_section(section_name, text):
+    """Whether a batched answer has the shape the ResumeBuilder page parses for this section."""
+    if not isinstance(text, str) or not text.strip():
+        return False
+    lines = [line for line in text.strip().split("\n") if line.strip()]
+    if section_name in ("job responsibility", "project description"):
+        return len(lines) <= 3
+    if section_name == "skills section":
+        return any(line.startswith(("Technical Skills:", "Soft Skills:")) for line in lines)
+    if section_name == "professional summary":
+        return 15 <= len(text.split()) <= 120
+    return True
+
+
+class BatchAnswerError(ValueError):
+    """A batched answer that is not the JSON shape asked for."""
+
+
+def parse_batch_answer(raw_text):
+    """{section id: text} from a batched answer; malformed entries are skipped. Raises BatchAnswerError if it is not JSON."""
+    try:
+        payload = json.loads(raw_text)
+    except json.JSONDecodeError as err:
+        raise BatchAnswerError(f"The batched answer is not valid JSON: {err}") from err
+    entries = payload.get("sections") if isinstance(payload, dict) else None
+    if not isinstance(entries, list):
+        raise BatchAnswerError("The batched answer has no list of sections.")
+    answers = {}
+    for entry in entries:
+        if isinstance(entry, dict) and isinstance(entry.get("id"), int) and isinstance(entry.get("text"), str):
+            answers.setdefault(entry["id"], entry["text"].strip())
+    return answers
+
+
+def enhance_sections_batched(sections, tone, api_key, bypass_cache=False, on_progress=None, usage=None):
+    """
+    Same contract as enhance_sections, but asks for every section in one structured
+    request. Sections missing from the answer or failing validation fall back to the
+    per-section path, as does every section when the answer cannot be parsed. When the
+    request itself fails (bad key, quota, provider down), every section reports that error
+    instead, since per-section calls would only repeat it.
+    """
+    if not sections:
+        return []
+    if not api_key:
+        return unenhanced_sections(sections, NO_API_KEY_PROBLEM, on_progress)
+
+    model_name = get_suitable_gemini_model(api_key)
+    if not model_name:
+        return unenhanced_sections(sections, NO_MODEL_PROBLEM, on_progress)
+
+    def generate():
+        raw_text = call_llm(
+            api_key,
+            model_name,
+            build_batch_prompt(sections, tone),
+            fallback_model=fallback_gemini_model(model_name),
+            generation_config={"response_mime_type": "application/json", "response_schema": BATCH_RESPONSE_SCHEMA},
+            safety_settings=SAFETY_SETTINGS,
+            usage=usage,
+        )
+        parse_batch_answer(raw_text) # Only well-formed answers are cached
+        return raw_text
+
+    try:
+        answers = parse_batch_answer(cached_generate(
+            model_name, BATCH_PROMPT_VERSION, (tone, json.dumps(sections)), generate, bypass=bypass_cache
+        ))
+    except BatchAnswerError:
+        answers = {}
     except Exception as e:
-        error_message = str(e)
-        if "API key not valid" in error_message or "Authentication error" in error_message:
-            st.error("🚨 Gemini API Key Invalid: Please check your API key and try again.")
-        elif "quota" in error_message or "rate limit" in error_message:
-            st.error("🚨 Gemini API Quota Exceeded or Rate Limited: You've hit your usage limits. Please wait a few minutes and try again, or check your usage on [Google AI Studio](https://makersuite.google.com/app/apikey).")
-        elif "404" in error_message and "models/" in error_message:
-            st.error(f"🚨 Gemini Model Not Found or Not Supported: The model '{model_name}' might be unavailable or deprecated for your API key. Please try regenerating to select another suitable model or check Google AI Studio for available models.")
+        # A vanished model is re-resolved on the next run
+        forget_gemini_model_if_missing(e, api_key)
+        if on_progress:
+            on_progress(len(sections), len(sections), "all sections")
+        return [(text, ("error", gemini_error_message(e, section_name, model_name))) for section_name, text in sections]
+
+    results = [None] * len(sections)
+    retry = []
+    for i, (section_name, _) in enumerate(sections):
+        if validate_enhanced_section(section_name, answers.get(i)):
+            results[i] = (answers[i], None)
         else:
-            st.error(f"🚨 An unexpected error occurred during AI enhancement for {section_name}: {e}")
-        return text_content
\ No newline at end of file
+            retry.append(i)
+
+    done = len(sections) - len(retry)
+    if on_progress and done:
+        on_progress(done, len(sections), "all sections")
+
+    if retry:
+        def report_retry(retried, _, section_name):
+            if on_progress:
+                on_progress(done + retried, len(sections), section_name)
+
+        fallback = enhance_sections([sections[i] for i in retry], tone, api_key, bypass_cache, report_retry, usage=usage, model_name=model_name)
+        for i, result in zip(retry, fallback):
+            results[i] = result
+    return results
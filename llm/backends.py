@@ -0,0 +1,236 @@
+import os
+import re
+import json
+import time
+import random
+import threading
+from abc import ABC, abstractmethod
+from typing import NamedTuple
+from llm.client_pool import get_client_pool
+
+# "gemini" (default) or "fake" for the offline backend below
+BACKEND_ENV = "LLM_BACKEND"
+
+
+class ModelInfo(NamedTuple):
+    """The parts of a provider's model listing the app uses."""
+    name: str
+    supported_generation_methods: tuple
+
+
+class BackendError(Exception):
+    """A failed backend call the provider SDK did not raise itself (a blocked prompt, a simulated outage)."""
+
+
+class LlmBackend(ABC):
+    """
+    What the AI features need from a model provider. `generate` returns the answer text,
+    `stream` yields it in chunks as it arrives, and `list_models` returns ModelInfo entries.
+    `generation_config` and `safety_settings` use the Gemini SDK's plain-dict forms;
+    `timeout` bounds a single request in seconds.
+    """
+
+    @abstractmethod
+    def generate(self, model, prompt, generation_config=None, safety_settings=None, timeout=None):
+        """The whole answer text."""
+
+    @abstractmethod
+    def stream(self, model, prompt, generation_config=None, safety_settings=None, timeout=None):
+        """Yields the answer text in chunks."""
+
+    @abstractmethod
+    def list_models(self):
+        """ModelInfo for every model the credentials can use."""
+
+
+class GeminiBackend(LlmBackend):
+    """Google Gemini through google-generativeai, using the pooled clients for its API key."""
+
+    def __init__(self, api_key):
+        self.api_key = api_key
+
+    def _model(self, model):
+        return get_client_pool().model(self.api_key, model)
+
+    @staticmethod
+    def _text(response):
+        """
+        The text of a response or stream chunk; "" when the candidate has no content (e.g. a
+        blocked answer). response.text and response.parts raise ValueError when there is no
+        candidate at all, so a blocked prompt is reported here as a BackendError instead.
+        """
+        if not response.candidates:
+            feedback = response.prompt_feedback
+            if feedback and feedback.block_reason:
+                raise BackendError(f"Gemini blocked the prompt ({feedback.block_reason.name}).")
+            return ""
+        return "".join(part.text for part in response.candidates[0].content.parts if hasattr(part, "text"))
+
+    @staticmethod
+    def _request_options(timeout):
+        return {"timeout": timeout} if timeout else None
+
+    def generate(self, model, prompt, generation_config=None, safety_settings=None, timeout=None):
+        response = self._model(model).generate_content(
+            prompt, generation_config=generation_config, safety_settings=safety_settings,
+            request_options=self._request_options(timeout),
+        )
+        return self._text(response)
+
+    def stream(self, model, prompt, generation_config=None, safety_settings=None, timeout=None):
+        response = self._model(model).generate_content(
+            prompt, generation_config=generation_config, safety_settings=safety_settings, stream=True,
+            request_options=self._request_options(timeout),
+        )
+        for chunk in response:
+            yield self._text(chunk)
+
+    def list_models(self):
+        # The Gemini SDK is slow to import, so only code paths that call it pay for it
+        import google.generativeai as genai
+        models = genai.list_models(client=get_client_pool().model_client(self.api_key))
+        return [ModelInfo(m.name, tuple(m.supported_generation_methods)) for m in models]
+
+
+FAKE_MODELS = [
+    ModelInfo(f"models/{name}", ("generateContent", "countTokens"))
+    for name in ("gemini-2.5-flash", "gemini-2.0-flash", "gemini-2.0-flash-lite")
+]
+
+FAKE_TEXT = "Delivered measurable results by streamlining processes and collaborating across teams."
+
+_BATCH_SECTIONS = re.compile(r"Sections:\n(\[.*?\n\])", re.S)
+
+# Categories a prompt spells out one per line, as the hybrid ATS prompt does
+_PROMPT_CATEGORIES = re.compile(r'^\s*"([^"]+)": \{"Positives"', re.M)
+
+
+def fake_ats_answer(prompt):
+    """A well-formed ATS answer for the categories the prompt asks for (all 14 by default)."""
+    from analyzer.analysis_enhancer import ATS_CATEGORIES # Imported here, since the analyzer imports this module
+
+    answer = {"ATS_Score": 70}
+    for category in _PROMPT_CATEGORIES.findall(prompt) or ATS_CATEGORIES:
+        answer[category] = {"Positives": [f"{category}: looks good."], "Negatives": [f"{category}: could be stronger."]}
+    return json.dumps(answer, indent=2)
+
+
+def fake_batch_answer(prompt):
+    """Echoes every section of a batched enhancement prompt back unchanged."""
+    match = _BATCH_SECTIONS.search(prompt)
+    items = json.loads(match.group(1)) if match else []
+    return json.dumps({"sections": [{"id": item["id"], "text": item["content"]} for item in items]})
+
+
+def fake_skills_answer(prompt):
+    return "Technical Skills: Python, SQL, Git\nSoft Skills: Communication, Teamwork"
+
+
+# Checked in order against the prompt; the first marker found picks the answer
+DEFAULT_FAKE_RESPONSES = {
+    '"ATS_Score"': fake_ats_answer,
+    'Return JSON {"sections"': fake_batch_answer,
+    "extract and categorize all relevant technical skills": fake_skills_answer,
+}
+
+
+class FakeBackend(LlmBackend):
+    """
+    Deterministic offline backend for benchmarks and load tests. Answers come from
+    `responses`, a {marker: answer} mapping checked in order against the prompt, where an
+    answer is a string or a callable taking the prompt; unmatched prompts get `default`.
+    Each call waits `latency` seconds (spread by up to `jitter` of it) and fails with
+    BackendError at `failure_rate`; latencies and failures replay identically for a given `seed`.
+    Streams are cut into `chunk_size` characters, `chunk_latency` seconds apart.
+    """
+
+    def __init__(self, responses=None, default=FAKE_TEXT, latency=0.0, jitter=0.0, failure_rate=0.0,
+                 chunk_size=64, chunk_latency=0.0, seed=0, models=FAKE_MODELS):
+        self.responses = DEFAULT_FAKE_RESPONSES if responses is None else responses
+        self.default = default
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.chunk_size = max(1, chunk_size)
+        self.chunk_latency = chunk_latency
+        self.models = list(models)
+        self.stats = {"calls": 0, "failures": 0}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _answer(self, prompt):
+        for marker, answer in self.responses.items():
+            if marker in prompt:
+                return answer(prompt) if callable(answer) else answer
+        return self.default
+
+    def _call(self, prompt, timeout=None):
+        # Draws are serialized so a seed gives the same sequence however calls interleave
+        with self._lock:
+            self.stats["calls"] += 1
+            delay = self.latency * (1 + self.jitter * (2 * self._rng.random() - 1))
+            failed = self._rng.random() < self.failure_rate
+            self.stats["failures"] += failed
+        if timeout is not None and delay > timeout:
+            time.sleep(timeout)
+            raise BackendError("504 Deadline Exceeded (simulated by the fake backend)")
+        time.sleep(max(0.0, delay))
+        if failed:
+            raise BackendError("503 Service Unavailable (simulated by the fake backend)")
+        return self._answer(prompt)
+
+    def generate(self, model, prompt, generation_config=None, safety_settings=None, timeout=None):
+        return self._call(prompt, timeout)
+
+    def stream(self, model, prompt, generation_config=None, safety_settings=None, timeout=None):
+        answer = self._call(prompt, timeout)
+        for start in range(0, len(answer), self.chunk_size):
+            if start and self.chunk_latency:
+                time.sleep(self.chunk_latency)
+            yield answer[start:start + self.chunk_size]
+
+    def list_models(self):
+        return list(self.models)
+
+
+def fake_backend_from_env():
+    """FakeBackend configured by LLM_FAKE_* variables; LLM_FAKE_RESPONSES names a JSON {marker: answer} file."""
+    responses = None
+    if os.getenv("LLM_FAKE_RESPONSES"):
+        with open(os.environ["LLM_FAKE_RESPONSES"], encoding="utf-8") as f:
+            responses = json.load(f)
+        for marker, answer in DEFAULT_FAKE_RESPONSES.items():
+            responses.setdefault(marker, answer)
+    return FakeBackend(
+        responses=responses,
+        latency=float(os.getenv("LLM_FAKE_LATENCY", "0")),
+        jitter=float(os.getenv("LLM_FAKE_JITTER", "0")),
+        failure_rate=float(os.getenv("LLM_FAKE_FAILURE_RATE", "0")),
+        chunk_latency=float(os.getenv("LLM_FAKE_CHUNK_LATENCY", "0")),
+        seed=int(os.getenv("LLM_FAKE_SEED", "0")),
+    )
+
+
+_override = None
+_fake = None
+_fake_lock = threading.Lock()
+
+
+def set_backend(backend):
+    """Routes every AI call in this process to `backend` (None restores the normal choice)."""
+    global _override
+    _override = backend
+
+
+def get_backend(api_key):
+    """The backend AI features should call for `api_key`: an override, the env-selected fake, or Gemini."""
+    global _fake
+    if _override is not None:
+        return _override
+    if os.getenv(BACKEND_ENV, "gemini").lower() == "fake":
+        # One fake per process, so its seeded sequence and stats span every call
+        with _fake_lock:
+            if _fake is None:
+                _fake = fake_backend_from_env()
+            return _fake
+    return GeminiBackend(api_key)
@@ -0,0 +1,78 @@
+import threading
+from collections import OrderedDict
+
+# Distinct API keys kept connected; the least recently used key's clients are dropped past this
+MAX_POOLED_KEYS = 32
+
+
+class GeminiClientPool:
+    """
+    Gemini service clients per API key and GenerativeModel objects per (API key, model),
+    built once and reused by every thread. Each key gets its own clients and connection,
+    so nothing goes through genai.configure's process-wide state and sessions using
+    different keys never see each other's credentials.
+    """
+
+    def __init__(self, max_keys=MAX_POOLED_KEYS):
+        self.max_keys = max_keys
+        self._clients = OrderedDict()
+        self._models = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _make_clients(api_key):
+        import google.ai.generativelanguage as glm
+        from google.api_core import client_options, gapic_v1
+        from google.generativeai.client import USER_AGENT, __version__
+
+        config = {
+            "client_options": client_options.ClientOptions(api_key=api_key),
+            "client_info": gapic_v1.client_info.ClientInfo(user_agent=f"{USER_AGENT}/{__version__}"),
+        }
+        return {
+            "generative": glm.GenerativeServiceClient(**config),
+            "model": glm.ModelServiceClient(**config),
+        }
+
+    def _clients_for(self, api_key):
+        # Called with the lock held
+        clients = self._clients.get(api_key)
+        if clients is None:
+            clients = self._clients[api_key] = self._make_clients(api_key)
+            while len(self._clients) > self.max_keys:
+                evicted, _ = self._clients.popitem(last=False)
+                self._models = {key: m for key, m in self._models.items() if key[0] != evicted}
+        self._clients.move_to_end(api_key)
+        return clients
+
+    def model_client(self, api_key):
+        """ModelServiceClient for `api_key` (for genai.list_models(client=...))."""
+        with self._lock:
+            return self._clients_for(api_key)["model"]
+
+    def model(self, api_key, model_name):
+        """A GenerativeModel bound to `api_key`'s pooled client."""
+        with self._lock:
+            model = self._models.get((api_key, model_name))
+            if model is None:
+                import google.generativeai as genai
+                model = genai.GenerativeModel(model_name)
+                # The SDK would otherwise fetch the process-wide default client on first use
+                model._client = self._clients_for(api_key)["generative"]
+                self._models[(api_key, model_name)] = model
+            else:
+                self._clients.move_to_end(api_key)
+            return model
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_client_pool():
+    """The shared process-wide pool."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = GeminiClientPool()
+        return _pool
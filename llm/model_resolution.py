@@ -0,0 +1,106 @@
+import os
+import json
+import time
+import threading
+from llm.response_cache import ResponseCache, cache_key
+
+# Resolved models per API key, shared by every session and surviving restarts
+MODEL_CACHE_PATH = os.getenv("LLM_MODEL_CACHE_PATH", ".cache/model_resolution.sqlite3")
+
+# Resolutions older than this are still used, but re-resolved on a background thread
+REFRESH_AFTER = 6 * 3600
+
+# Resolutions older than this are dropped and resolved again before use
+MAX_AGE = 7 * 24 * 3600
+
+
+class ModelResolver:
+    """
+    Remembers which model each API key resolved to, in memory and in a SQLite store keyed
+    by a hash of the key (the key itself is never written). A new session or a restarted
+    server reuses the stored answer without listing models. Stale answers are served while
+    a background thread refreshes them; `forget` drops one, e.g. after a "not found" error.
+    """
+
+    def __init__(self, store=None, refresh_after=REFRESH_AFTER):
+        # LLM_CACHE_DISABLED is about answers; resolutions are still remembered
+        self.store = store or ResponseCache(MODEL_CACHE_PATH, ttl=MAX_AGE, honor_disabled_env=False)
+        self.refresh_after = refresh_after
+        self._memory = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(api_key, version):
+        return cache_key("model-resolution", version, api_key)
+
+    def _remember(self, key, model, version):
+        entry = (model, time.time())
+        with self._lock:
+            self._memory[key] = entry
+        self.store.put(key, json.dumps(entry), model, version)
+
+    def resolve(self, api_key, choose, version=""):
+        """
+        The remembered model for `api_key`, or `choose()` (which lists models and picks one;
+        it may raise) on first use. `version` names the selection rules, so changing them
+        re-resolves every key. A None from `choose` is returned but not remembered.
+        """
+        key = self._key(api_key, version)
+        with self._lock:
+            entry = self._memory.get(key)
+        if entry is None:
+            stored = self.store.get(key)
+            if stored is not None:
+                entry = tuple(json.loads(stored))
+                with self._lock:
+                    self._memory[key] = entry
+
+        if entry is None:
+            model = choose()
+            if model:
+                self._remember(key, model, version)
+            return model
+
+        model, resolved_at = entry
+        if time.time() - resolved_at > self.refresh_after:
+            self._refresh_in_background(key, choose, version)
+        return model
+
+    def _refresh_in_background(self, key, choose, version):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                model = choose()
+                if model:
+                    self._remember(key, model, version)
+            except Exception:
+                pass # The current answer stays until a refresh succeeds
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, name="model-refresh", daemon=True).start()
+
+    def forget(self, api_key, version=""):
+        key = self._key(api_key, version)
+        with self._lock:
+            self._memory.pop(key, None)
+        self.store.delete(key)
+
+
+_resolver = None
+_resolver_lock = threading.Lock()
+
+
+def get_model_resolver():
+    """The shared process-wide resolver."""
+    global _resolver
+    with _resolver_lock:
+        if _resolver is None:
+            _resolver = ModelResolver()
+        return _resolver
@@ -0,0 +1,139 @@
+import os
+import re
+import math
+
+# Rough size of a token for English prose; close enough to budget Gemini prompts
+CHARS_PER_TOKEN = 4
+
+# Resume text sent to the model is capped at this many estimated tokens
+RESUME_TOKEN_BUDGET = int(os.getenv("LLM_RESUME_TOKEN_BUDGET", "6000"))
+
+_SPACES = re.compile(r"[^\S\n]+")
+_BLANK_RUNS = re.compile(r"\n{3,}")
+
+# Lines that are layout artifacts rather than content: page numbers, lone bullets and rules
+_ARTIFACT_LINE = re.compile(
+    r"^(?:(?:page\s*)?\d{1,3}(?:\s*(?:/|of)\s*\d{1,3})?|[•·▪◦●■\-–—*_=|.]+)$", re.I
+)
+
+# Content lines, which are never dropped as page furniture however often they repeat
+_BULLET_LINE = re.compile(r"^[•·▪◦●■\-–—*>]")
+
+# Page separator in extracted PDF text (preprocessor.parser.PAGE_BREAK)
+_PAGE_BREAK = "\f"
+
+# Lines at the top and bottom of each page where running headers and footers sit
+PAGE_EDGE_LINES = 3
+
+# Longest line (in words) still taken for a header or footer when it repeats once per page
+SHORT_LINE_WORDS = 8
+
+
+def _page_furniture(pages):
+    """
+    Lines (casefolded) that are running headers or footers: found in the same place (the same
+    line from the top or bottom) on at least two pages or, on resumes of three pages or more,
+    short lines near the edges of almost every page, once each. Bullets never qualify.
+    """
+    if len(pages) < 2:
+        return set()
+    slots = {}
+    edge_pages = {}
+    for page in pages:
+        lines = [line for line in (_SPACES.sub(" ", l).strip().casefold() for l in page.splitlines()) if line]
+        edges = {}
+        for i, line in enumerate(lines[:PAGE_EDGE_LINES]):
+            edges.setdefault(line, set()).add(i)
+        for i, line in enumerate(reversed(lines[-PAGE_EDGE_LINES:])):
+            edges.setdefault(line, set()).add(-1 - i)
+        for line, positions in edges.items():
+            if lines.count(line) == 1:
+                edge_pages[line] = edge_pages.get(line, 0) + 1
+            for position in positions:
+                slots[line, position] = slots.get((line, position), 0) + 1
+
+    furniture = {line for (line, _), count in slots.items() if count >= 2}
+    if len(pages) >= 3:
+        furniture |= {
+            line for line, count in edge_pages.items()
+            if count >= len(pages) - 1 and len(line.split()) <= SHORT_LINE_WORDS
+        }
+    return {line for line in furniture if not _BULLET_LINE.match(line)}
+
+
+def estimate_tokens(text):
+    return math.ceil(len(text) / CHARS_PER_TOKEN) if text else 0
+
+
+def compact_text(text):
+    """
+    Layout-free form of extracted resume text: runs of spaces and tabs collapsed, lines
+    trimmed, page numbers and lone bullet or rule characters dropped, running page headers
+    and footers kept only where they first appear, and at most one blank line in a row.
+    Repeated content (job titles, bullets) is kept, since the review judges repetition.
+    """
+    furniture = _page_furniture(text.split(_PAGE_BREAK))
+    seen = set()
+    lines = []
+    for line in text.splitlines():
+        line = _SPACES.sub(" ", line).strip()
+        if not line:
+            lines.append("")
+            continue
+        if _ARTIFACT_LINE.match(line):
+            continue
+        key = line.casefold()
+        if key in furniture:
+            if key in seen:
+                continue
+            seen.add(key)
+        lines.append(line)
+    return _BLANK_RUNS.sub("\n\n", "\n".join(lines)).strip()
+
+
+def truncate_to_budget(text, max_tokens):
+    """
+    `text` cut at a line boundary to about `max_tokens`, with a note saying how much was
+    left out → (text, truncated). The head of a resume holds its most important content.
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text, False
+    lines = text.split("\n")
+    kept, used = [], 0
+    for line in lines:
+        cost = estimate_tokens(line + "\n")
+        if used + cost > max_tokens:
+            break
+        kept.append(line)
+        used += cost
+    omitted = len(lines) - len(kept)
+    return "\n".join(kept) + f"\n[... {omitted} more lines omitted to fit the length limit ...]", True
+
+
+def prepare_prompt_text(text, max_tokens=RESUME_TOKEN_BUDGET):
+    """Compacts and caps text for a prompt → (text, stats) with raw/sent token estimates."""
+    compacted = compact_text(text)
+    sent, truncated = truncate_to_budget(compacted, max_tokens)
+    return sent, {
+        "raw_tokens": estimate_tokens(text),
+        "sent_tokens": estimate_tokens(sent),
+        "truncated": truncated,
+    }
+
+
+if __name__ == "__main__":
+    # How much compaction saves on a folder of resumes
+    import sys
+    from preprocessor.batch import find_resumes
+    from preprocessor.parser import extract_text_from_path
+
+    resume_dir = sys.argv[1] if len(sys.argv) > 1 else "data/resumes"
+    raw_total = sent_total = 0
+    for path in find_resumes(resume_dir):
+        name = os.path.basename(path)
+        _, stats = prepare_prompt_text(extract_text_from_path(path))
+        raw_total += stats["raw_tokens"]
+        sent_total += stats["sent_tokens"]
+        print(f"{name}: ~{stats['raw_tokens']} → ~{stats['sent_tokens']} tokens" + (" (truncated)" if stats["truncated"] else ""))
+    if raw_total:
+        print(f"total ~{raw_total} → ~{sent_total} tokens ({1 - sent_total / raw_total:.0%} smaller)")
@@ -0,0 +1,203 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import deque
+from dataclasses import dataclass
+
+# Set to a file path to share quota usage between processes (e.g. several server workers);
+# by default usage is tracked per process
+QUOTA_STORE_ENV = "LLM_QUOTA_STORE"
+
+DAY = 24 * 3600
+
+
+class QuotaExceededError(Exception):
+    """The key's daily budget is spent; nothing more is sent until it resets."""
+
+
+@dataclass(frozen=True)
+class QuotaLimits:
+    """Per-key budgets; 0 means unlimited. Tokens are estimated prompt tokens."""
+    requests_per_minute: int = 0
+    tokens_per_minute: int = 0
+    requests_per_day: int = 0
+    tokens_per_day: int = 0
+
+
+def quota_limits_from_env():
+    return QuotaLimits(
+        requests_per_minute=int(os.getenv("GEMINI_REQUESTS_PER_MINUTE", "20")),
+        tokens_per_minute=int(os.getenv("GEMINI_TOKENS_PER_MINUTE", "250000")),
+        requests_per_day=int(os.getenv("GEMINI_REQUESTS_PER_DAY", "0")),
+        tokens_per_day=int(os.getenv("GEMINI_TOKENS_PER_DAY", "0")),
+    )
+
+
+def day_start(now):
+    """Start of the current UTC day, when daily budgets reset."""
+    return now - now % DAY
+
+
+class UsageStore:
+    """
+    Request log per key in SQLite (in memory, or a file shared by several processes).
+    Checking the limits and recording a request happen in one transaction, so processes
+    sharing the file cannot both take the last slot.
+    """
+
+    def __init__(self, path=":memory:"):
+        self.path = path
+        self._lock = threading.Lock()
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10, isolation_level=None)
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS usage (key TEXT, ts REAL, tokens INTEGER)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS usage_key_ts ON usage (key, ts)")
+
+    def _totals(self, key, since):
+        return self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(tokens), 0), MIN(ts) FROM usage WHERE key = ? AND ts >= ?", (key, since)
+        ).fetchone()
+
+    def try_reserve(self, key, tokens, limits, now=None):
+        """
+        Records a request of `tokens` if every limit allows it → (granted, seconds until a
+        retry may succeed). Raises QuotaExceededError when a daily budget would be exceeded.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                day_requests, day_tokens, _ = self._totals(key, day_start(now))
+                if limits.requests_per_day and day_requests >= limits.requests_per_day:
+                    raise QuotaExceededError(
+                        f"The daily AI budget for this key is spent ({limits.requests_per_day} requests); it resets at midnight UTC."
+                    )
+                if limits.tokens_per_day and day_tokens + tokens > limits.tokens_per_day:
+                    raise QuotaExceededError(
+                        f"The daily AI budget for this key is spent ({limits.tokens_per_day} tokens); it resets at midnight UTC."
+                    )
+
+                minute_requests, minute_tokens, oldest = self._totals(key, now - 60)
+                # A request larger than the whole per-minute token budget still goes out, alone
+                over_tokens = limits.tokens_per_minute and minute_requests and minute_tokens + tokens > limits.tokens_per_minute
+                if (limits.requests_per_minute and minute_requests >= limits.requests_per_minute) or over_tokens:
+                    conn.execute("ROLLBACK")
+                    return False, max(0.01, oldest + 60 - now)
+
+                conn.execute("INSERT INTO usage (key, ts, tokens) VALUES (?, ?, ?)", (key, now, tokens))
+                conn.execute("DELETE FROM usage WHERE key = ? AND ts < ?", (key, day_start(now)))
+                conn.execute("COMMIT")
+                return True, 0.0
+            except BaseException:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+
+    def today(self, key, now=None):
+        """(requests, tokens) recorded for `key` since the daily reset."""
+        now = time.time() if now is None else now
+        with self._lock:
+            requests, tokens, _ = self._totals(key, day_start(now))
+        return requests, tokens
+
+
+class QuotaGovernor:
+    """
+    Admits requests for one API key within its per-minute and daily budgets. Callers in
+    this process queue first come, first served; `status()` reports the queue for the UI.
+    """
+
+    def __init__(self, key, limits, store):
+        # Only a hash of the key reaches the store
+        self.key = hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+        self.limits = limits
+        self.store = store
+        self._queue = deque()
+        self._tickets = 0
+        self._retry_after = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self, tokens=0):
+        """Waits for this caller's turn and a free slot. Returns the seconds spent waiting."""
+        start = time.monotonic()
+        with self._cond:
+            self._tickets += 1
+            ticket = self._tickets
+            self._queue.append(ticket)
+            try:
+                while True:
+                    if self._queue[0] != ticket:
+                        self._cond.wait()
+                        continue
+                    granted, retry_after = self.store.try_reserve(self.key, tokens, self.limits)
+                    if granted:
+                        self._retry_after = 0.0
+                        return time.monotonic() - start
+                    self._retry_after = retry_after
+                    self._cond.wait(timeout=retry_after)
+            finally:
+                self._queue.remove(ticket)
+                self._cond.notify_all()
+
+    def try_acquire(self, tokens=0):
+        """Takes a slot only if one is free now and nobody is queued; never waits. Returns whether it did."""
+        with self._cond:
+            if self._queue:
+                return False
+            try:
+                granted, _ = self.store.try_reserve(self.key, tokens, self.limits)
+            except QuotaExceededError:
+                return False
+            return granted
+
+    def status(self):
+        """Queue depth, a rough wait estimate for a new caller, and today's usage and budget."""
+        with self._cond:
+            depth = len(self._queue)
+            retry_after = self._retry_after
+        per_request = 60 / self.limits.requests_per_minute if self.limits.requests_per_minute else 0.0
+        requests_today, tokens_today = self.store.today(self.key)
+        return {
+            "queue_depth": depth,
+            "estimated_wait": retry_after + depth * per_request if depth else 0.0,
+            "requests_today": requests_today,
+            "tokens_today": tokens_today,
+            "requests_per_day": self.limits.requests_per_day,
+            "tokens_per_day": self.limits.tokens_per_day,
+        }
+
+
+_governors = {}
+_store = None
+_governors_lock = threading.Lock()
+
+
+def get_quota_governor(api_key):
+    """One governor per API key per process, all sharing one usage store."""
+    global _store
+    with _governors_lock:
+        governor = _governors.get(api_key)
+        if governor is None:
+            if _store is None:
+                _store = UsageStore(os.getenv(QUOTA_STORE_ENV) or ":memory:")
+            governor = _governors[api_key] = QuotaGovernor(api_key, quota_limits_from_env(), _store)
+        return governor
+
+
+def quota_status_message(api_key):
+    """One line for the UI about the key's queue and daily budget, or None when there is nothing to say."""
+    status = get_quota_governor(api_key).status()
+    parts = []
+    if status["queue_depth"]:
+        parts.append(f"{status['queue_depth']} AI requests queued (about {status['estimated_wait']:.0f}s wait)")
+    if status["requests_per_day"]:
+        parts.append(f"{max(0, status['requests_per_day'] - status['requests_today'])} of {status['requests_per_day']} daily AI requests left")
+    if status["tokens_per_day"]:
+        parts.append(f"~{max(0, status['tokens_per_day'] - status['tokens_today'])} daily AI tokens left")
+    return "; ".join(parts) + "." if parts else None
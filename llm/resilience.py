@@ -0,0 +1,319 @@
+import os
+import time
+import random
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from llm.backends import get_backend
+from llm.prompt_budget import estimate_tokens
+from llm.quota import get_quota_governor
+
+# Whole-call budget in seconds, retries and hedges included
+DEFAULT_DEADLINE = float(os.getenv("LLM_DEADLINE_SECONDS", "90"))
+
+# Attempts per call, and the backoff between them (full jitter, capped)
+RETRY_ATTEMPTS = 3
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 8.0
+
+# Set LLM_HEDGE=0 to never send duplicate requests to the fallback model
+HEDGE_ENV = "LLM_HEDGE"
+
+# Latencies remembered per model, and how many are needed before hedging at their p95
+LATENCY_WINDOW = 200
+HEDGE_MIN_SAMPLES = 20
+
+# Consecutive provider failures that open the breaker, and how long it stays open
+BREAKER_THRESHOLD = 5
+BREAKER_RESET_AFTER = 30.0
+
+# Exception class names (anywhere in the MRO) and status codes worth another attempt
+RETRYABLE_ERRORS = (
+    "ResourceExhausted", "TooManyRequests", "ServiceUnavailable", "InternalServerError",
+    "DeadlineExceeded", "GatewayTimeout", "TimeoutError", "ConnectionError",
+)
+RETRYABLE_STATUS = ("429", "500", "502", "503", "504")
+
+
+class CircuitOpenError(Exception):
+    """Calls are short-circuited because the provider has been failing."""
+
+
+class LlmDeadlineError(TimeoutError):
+    """No answer within the call's deadline."""
+
+
+def is_retryable(error):
+    if isinstance(error, CircuitOpenError):
+        return False
+    if any(cls.__name__ in RETRYABLE_ERRORS for cls in type(error).__mro__):
+        return True
+    message = str(error)
+    return any(status in message for status in RETRYABLE_STATUS) or "timed out" in message.lower()
+
+
+def is_provider_failure(error):
+    """Whether `error` means the provider is unavailable (rather than the request being wrong)."""
+    return isinstance(error, CircuitOpenError) or is_retryable(error)
+
+
+def backoff_delay(attempt, base=BACKOFF_BASE, cap=BACKOFF_MAX):
+    """Full-jitter exponential backoff before retry number `attempt` (1-based)."""
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+
+class LatencyTracker:
+    """Recent call latencies for one model."""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q, min_samples=HEDGE_MIN_SAMPLES):
+        """The q-th percentile (0-100), or None until `min_samples` have been seen."""
+        with self._lock:
+            samples = sorted(self._samples)
+        if len(samples) < min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * q / 100))]
+
+
+class CircuitBreaker:
+    """
+    Opens after `threshold` consecutive provider failures and rejects calls for `reset_after`
+    seconds; then lets a single trial call through, closing again if it succeeds.
+    """
+
+    def __init__(self, threshold=BREAKER_THRESHOLD, reset_after=BREAKER_RESET_AFTER):
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            return "half-open" if time.monotonic() - self._opened_at >= self.reset_after else "open"
+
+    def _rejection(self, remaining):
+        return CircuitOpenError(f"The AI provider is failing; calls are paused for about {max(1, round(remaining))}s.")
+
+    def check(self):
+        """Raises CircuitOpenError if allow() would, without taking the half-open trial."""
+        with self._lock:
+            if self._opened_at is None:
+                return
+            remaining = self.reset_after - (time.monotonic() - self._opened_at)
+            if remaining <= 0 and not self._trial_running:
+                return
+        raise self._rejection(remaining)
+
+    def allow(self):
+        """
+        Raises CircuitOpenError unless a call may go out now. Returns True when that call is
+        the half-open trial, which must end in record_success, record_failure or release_trial.
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return False
+            remaining = self.reset_after - (time.monotonic() - self._opened_at)
+            if remaining <= 0 and not self._trial_running:
+                self._trial_running = True
+                return True
+        raise self._rejection(remaining)
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def release_trial(self):
+        """Ends a trial call that gave no verdict on the provider (e.g. it was abandoned)."""
+        with self._lock:
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_running or self._failures >= self.threshold:
+                self._opened_at = time.monotonic()
+            self._trial_running = False
+
+
+_trackers = {}
+_breakers = {}
+_registry_lock = threading.Lock()
+_usage_lock = threading.Lock()
+
+# Runs backend calls so they can be abandoned at a deadline or raced against a hedge
+_calls = ThreadPoolExecutor(max_workers=16, thread_name_prefix="llm-call")
+
+
+def get_latency_tracker(model):
+    with _registry_lock:
+        tracker = _trackers.get(model)
+        if tracker is None:
+            tracker = _trackers[model] = LatencyTracker()
+        return tracker
+
+
+def get_circuit_breaker(key):
+    """One breaker per key (e.g. API key) per process."""
+    with _registry_lock:
+        breaker = _breakers.get(key)
+        if breaker is None:
+            breaker = _breakers[key] = CircuitBreaker()
+        return breaker
+
+
+def hedging_enabled():
+    return os.getenv(HEDGE_ENV, "1").lower() not in ("0", "false", "no")
+
+
+def record_usage(usage, prompt, answer):
+    """Adds one call's estimated input and output tokens to a `usage` dict (if given); safe across threads."""
+    if usage is None:
+        return
+    with _usage_lock:
+        usage["calls"] = usage.get("calls", 0) + 1
+        usage["input_tokens"] = usage.get("input_tokens", 0) + estimate_tokens(prompt)
+        usage["output_tokens"] = usage.get("output_tokens", 0) + estimate_tokens(answer)
+
+
+def _timed_generate(backend, model, prompt, timeout, kwargs):
+    start = time.perf_counter()
+    answer = backend.generate(model, prompt, timeout=timeout, **kwargs)
+    get_latency_tracker(model).record(time.perf_counter() - start)
+    return answer
+
+
+def _attempt(backend, model, fallback_model, prompt, governor, deadline, kwargs):
+    """
+    One attempt: the primary request (already admitted by the caller), plus a hedge to
+    `fallback_model` once it is slower than its p95. The hedge goes out only if a quota
+    slot is free at that moment, so it never queues behind (or ahead of) other callers.
+    """
+    remaining = deadline - time.monotonic()
+    primary = _calls.submit(_timed_generate, backend, model, prompt, remaining, kwargs)
+    hedge_after = get_latency_tracker(model).percentile(95) if fallback_model and hedging_enabled() else None
+
+    pending = {primary}
+    if hedge_after is not None and hedge_after < remaining:
+        done, _ = wait(pending, timeout=hedge_after)
+        if not done and governor.try_acquire(estimate_tokens(prompt)):
+            pending.add(_calls.submit(
+                _timed_generate, backend, fallback_model, prompt, deadline - time.monotonic(), kwargs
+            ))
+
+    error = None
+    while pending:
+        done, pending = wait(pending, timeout=max(0.0, deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+        if not done:
+            raise error or LlmDeadlineError(f"No answer from {model} within the deadline.")
+        for future in done:
+            if future.exception() is None:
+                return future.result()
+            # The primary's error wins, since the hedge may fail for its own reasons
+            if future is primary or error is None:
+                error = future.exception()
+    raise error
+
+
+def call_llm(api_key, model, prompt, fallback_model=None, deadline=DEFAULT_DEADLINE, attempts=RETRY_ATTEMPTS, usage=None, **kwargs):
+    """
+    backend.generate(model, prompt, **kwargs) with retries, a deadline and a circuit breaker.
+    Retryable errors are retried with jittered exponential backoff while the deadline allows;
+    once `model` has enough history, an attempt slower than its p95 is hedged with the same
+    request to `fallback_model` and the first answer wins. Every request waits for the key's
+    quota governor; time in its queue does not count against the deadline.
+    A `usage` dict, if given, accumulates the answered call's estimated tokens (see record_usage).
+    Raises CircuitOpenError while the provider is marked as failing, QuotaExceededError once
+    the key's daily budget is spent, otherwise the last error.
+    """
+    breaker = get_circuit_breaker(api_key)
+    backend = get_backend(api_key)
+    governor = get_quota_governor(api_key)
+    end = time.monotonic() + deadline
+
+    for attempt in range(1, attempts + 1):
+        # Quota before the breaker's trial slot, so a spent budget never leaves a trial claimed
+        breaker.check()
+        end += governor.acquire(estimate_tokens(prompt))
+        trial = breaker.allow()
+        try:
+            answer = _attempt(backend, model, fallback_model, prompt, governor, end, kwargs)
+        except Exception as error:
+            if not is_retryable(error):
+                # The request itself is wrong; the provider is fine
+                breaker.record_success()
+                raise
+            breaker.record_failure()
+            delay = backoff_delay(attempt)
+            if attempt == attempts or time.monotonic() + delay >= end:
+                raise
+            time.sleep(delay)
+        except BaseException:
+            if trial:
+                breaker.release_trial()
+            raise
+        else:
+            breaker.record_success()
+            record_usage(usage, prompt, answer)
+            return answer
+
+
+def stream_llm(api_key, model, prompt, deadline=DEFAULT_DEADLINE, attempts=RETRY_ATTEMPTS, usage=None, **kwargs):
+    """
+    backend.stream(...) behind the same breaker and quota governor, retrying retryable errors
+    only until the first chunk arrives; a stream that fails part-way raises, since its output is already out.
+    A stream the consumer stops reading counts as a success once chunks have arrived.
+    A `usage` dict, if given, accumulates the estimated tokens of a stream that produced output, however it ended.
+    """
+    breaker = get_circuit_breaker(api_key)
+    backend = get_backend(api_key)
+    governor = get_quota_governor(api_key)
+    end = time.monotonic() + deadline
+
+    for attempt in range(1, attempts + 1):
+        breaker.check()
+        end += governor.acquire(estimate_tokens(prompt))
+        trial = breaker.allow()
+        started = False
+        received = []
+        try:
+            for chunk in backend.stream(model, prompt, timeout=end - time.monotonic(), **kwargs):
+                started = True
+                received.append(chunk)
+                yield chunk
+        except Exception as error:
+            if not is_retryable(error):
+                breaker.record_success()
+                raise
+            breaker.record_failure()
+            delay = backoff_delay(attempt)
+            if started or attempt == attempts or time.monotonic() + delay >= end:
+                raise
+            time.sleep(delay)
+        except BaseException:
+            # GeneratorExit when the consumer drops the stream (e.g. a Streamlit rerun)
+            if started:
+                breaker.record_success()
+            elif trial:
+                breaker.release_trial()
+            raise
+        else:
+            breaker.record_success()
+            return
+        finally:
+            # A started stream is never retried, so this records each call once
+            if started:
+                record_usage(usage, prompt, "".join(received))
@@ -0,0 +1,175 @@
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import threading
+
+# On-disk cache of LLM responses, shared by every session and surviving restarts
+CACHE_PATH = os.getenv("LLM_CACHE_PATH", ".cache/llm_responses.sqlite3")
+
+# Responses older than this are treated as misses and dropped
+DEFAULT_TTL = 7 * 24 * 3600
+
+# Total stored response size; least recently used entries are evicted past this
+MAX_CACHE_BYTES = 64 * 1024 * 1024
+
+# Set LLM_CACHE_DISABLED=1 to always call the model (reads and writes are both skipped)
+DISABLED_ENV = "LLM_CACHE_DISABLED"
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_input(text: str):
+    """Whitespace-insensitive form of an input, so re-extracted or re-pasted text still hits."""
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def cache_key(model: str, template_version: str, *inputs: str):
+    """sha256 over model, prompt-template version and the normalized inputs."""
+    digest = hashlib.sha256()
+    for part in (model, template_version, *map(normalize_input, inputs)):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class ResponseCache:
+    """
+    SQLite-backed response cache with a TTL and a size cap (LRU eviction).
+    Safe to share across threads; separate processes coordinate through SQLite's own locking.
+    `honor_disabled_env=False` keeps a store that is not an answer cache on when LLM_CACHE_DISABLED is set.
+    """
+
+    def __init__(self, path=CACHE_PATH, ttl=DEFAULT_TTL, max_bytes=MAX_CACHE_BYTES, honor_disabled_env=True):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.honor_disabled_env = honor_disabled_env
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "writes": 0, "evictions": 0}
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, model TEXT, template TEXT, value TEXT,"
+                " size INTEGER, created REAL, last_used REAL, hits INTEGER DEFAULT 0)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+        return self._conn
+
+    def enabled(self):
+        return not self.honor_disabled_env or os.getenv(DISABLED_ENV, "").lower() not in ("1", "true", "yes")
+
+    def get(self, key):
+        """Cached response text, or None on a miss or an expired entry."""
+        if not self.enabled():
+            return None
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT value, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+            value, created = row
+            if now - created > self.ttl:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                conn.commit()
+                self.stats["expired"] += 1
+                self.stats["misses"] += 1
+                return None
+            conn.execute("UPDATE responses SET last_used = ?, hits = hits + 1 WHERE key = ?", (now, key))
+            conn.commit()
+            self.stats["hits"] += 1
+            return value
+
+    def put(self, key, value, model="", template=""):
+        if not self.enabled():
+            return
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, template, value, size, created, last_used, hits)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, 0)",
+                (key, model, template, value, size, now, now),
+            )
+            self.stats["writes"] += 1
+            self._evict(conn)
+            conn.commit()
+
+    def delete(self, key):
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            conn.commit()
+
+    def _evict(self, conn):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Walk from least recently used until enough bytes are freed
+        doomed, freed = [], 0
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY last_used"):
+            if total - freed <= self.max_bytes:
+                break
+            doomed.append((key,))
+            freed += size
+        conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+        self.stats["evictions"] += len(doomed)
+
+    def clear(self):
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM responses")
+            conn.commit()
+
+    def summary(self):
+        """Process-level hit metrics plus what is on disk."""
+        with self._lock:
+            entries, size = self._connect().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {**self.stats, "hit_rate": self.stats["hits"] / lookups if lookups else 0.0, "entries": entries, "bytes": size}
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """The shared process-wide cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache()
+        return _cache
+
+
+def cached_generate(model, template_version, inputs, generate, bypass=False):
+    """
+    Returns the cached response for (model, template version, inputs), or calls `generate()`
+    and stores its result. `bypass` skips the lookup but still refreshes the stored answer.
+    `generate` may return None to signal a response that must not be cached.
+    """
+    cache = get_response_cache()
+    key = cache_key(model, template_version, *inputs)
+    if not bypass:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+    value = generate()
+    if value is not None:
+        cache.put(key, value, model, template_version)
+    return value
+
+
+if __name__ == "__main__":
+    print(get_response_cache().summary())
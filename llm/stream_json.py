@@ -0,0 +1,138 @@
+import json
+
+
+class StreamJsonError(ValueError):
+    pass
+
+
+class JsonMemberStream:
+    """
+    Incremental parser for a streamed JSON object. Feed it text chunks as they arrive;
+    each top-level member is returned as (key, value) the moment its value is complete,
+    so a category object is available as soon as its closing brace streams in.
+    Text before the opening brace (e.g. a ```json fence) and after the closing one is ignored.
+    """
+
+    def __init__(self):
+        self._member = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self.done = False
+
+    def feed(self, chunk):
+        """Consumes a chunk and returns the members it completed, in order."""
+        members = []
+        for ch in chunk:
+            if self.done:
+                break
+            if self._depth == 0:
+                # Outside the object: wait for its opening brace
+                if ch == "{":
+                    self._depth = 1
+                continue
+
+            if self._in_string:
+                self._member.append(ch)
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+                self._member.append(ch)
+            elif ch in "{[":
+                self._depth += 1
+                self._member.append(ch)
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    members.extend(self._flush())
+                    self.done = True
+                else:
+                    self._member.append(ch)
+                    if self._depth == 1:
+                        # A nested object or array just closed: its member is complete
+                        members.extend(self._flush())
+            elif ch == "," and self._depth == 1:
+                members.extend(self._flush())
+            else:
+                self._member.append(ch)
+        return members
+
+    def _flush(self):
+        text = "".join(self._member).strip()
+        self._member = []
+        if not text:
+            return []
+        try:
+            return list(json.loads("{" + text + "}").items())
+        except json.JSONDecodeError as err:
+            raise StreamJsonError(f"Malformed member in streamed JSON: {err}: {text[:80]}") from err
+
+    def close(self):
+        """Call once the stream ends; raises if the object never closed."""
+        if not self.done:
+            raise StreamJsonError("Streamed JSON object ended before its closing brace")
+
+
+def iter_json_members(chunks):
+    """(key, value) for each top-level member of the JSON object spread over `chunks`."""
+    parser = JsonMemberStream()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    parser.close()
+
+
+# A streamed ATS answer, as chunks, for checking the parser against real chunk boundaries
+RECORDED_ANSWER_PATH = "data/llm_recordings/ats_answer_chunks.json"
+
+
+def replay_splits(text, seed=0, random_splits=200):
+    """
+    Chunkings of `text` to replay: cut at every single position, one character per chunk,
+    and `random_splits` seeded random chunkings of 2 to 40 pieces.
+    """
+    import random
+
+    for i in range(1, len(text)):
+        yield [text[:i], text[i:]]
+    yield list(text)
+    rng = random.Random(seed)
+    for _ in range(random_splits):
+        cuts = sorted(rng.sample(range(1, len(text)), min(rng.randint(1, 39), len(text) - 1)))
+        yield [text[i:j] for i, j in zip([0] + cuts, cuts + [len(text)])]
+
+
+if __name__ == "__main__":
+    # Replays a recorded answer (a JSON list of chunk strings, or a raw answer) as recorded and at
+    # many other split points, checking the streamed members against parsing the whole text at once
+    import sys
+
+    with open(sys.argv[1] if len(sys.argv) > 1 else RECORDED_ANSWER_PATH, encoding="utf-8") as f:
+        recorded = f.read()
+    try:
+        chunks = json.loads(recorded)
+        if not isinstance(chunks, list):
+            raise ValueError
+    except ValueError:
+        chunks = [recorded]
+
+    whole = "".join(chunks)
+    expected = json.loads(whole[whole.find("{"):whole.rfind("}") + 1])
+    failures = 0
+    replays = 0
+    for split in [chunks, *replay_splits(whole)]:
+        replays += 1
+        try:
+            streamed = list(iter_json_members(split))
+        except StreamJsonError as err:
+            streamed = err
+        if not isinstance(streamed, list) or dict(streamed) != expected or len(streamed) != len(expected):
+            failures += 1
+            if failures <= 3:
+                print(f"mismatch with chunk lengths {[len(c) for c in split][:20]}: {streamed}")
+    print(f"{len(chunks)} recorded chunks, {len(expected)} members, {replays} replays, {failures} mismatches")
+    sys.exit(1 if failures else 0)
@@ -2,7 +2,8 @@ import streamlit as st # type: ignore
 import ui.render_footer as footer
 import ui.render_header as header
 import preprocessor.parser as parser
-from preprocessor.skills import extract_skills_fuzzy, extract_soft_skills_fuzzy, weighted_skill_analysis
+from preprocessor.skill_registry import get_skill_registry
+from recommender.job_match import match_resume_to_jd, match_resume_to_jds, rank_job_matches, load_sample_job_descriptions, content_hash
 from recommender.resources import learning_resources
 from preprocessor.spacy_nlp import load_spacy_nlp_model
 
@@ -22,6 +23,16 @@ st.title("🔎 JobMatcher")
 st.caption("See how well your resume aligns with a target job description.")
 st.divider()
 
+# Match results are cached by content hash (plus lexicon version), so widget reruns never re-run NLP
+@st.cache_data(max_entries=32, show_spinner=False)
+def run_job_match(resume_hash, jd_hash, lexicon_version, _resume_text, _jd_text):
+    return match_resume_to_jd(_resume_text, _jd_text, load_spacy_nlp_model())
+
+# Multi-JD ranking: the resume is parsed once and every JD goes through one batched pass
+@st.cache_data(max_entries=8, show_spinner=False)
+def run_job_ranking(resume_hash, jd_hashes, lexicon_version, _resume_text, _jd_texts):
+    return match_resume_to_jds(_resume_text, _jd_texts, load_spacy_nlp_model())
+
 # Session state setup
 if "resume_text_jobmatcher" not in st.session_state:
     st.session_state.resume_text_jobmatcher = None
@@ -50,7 +61,7 @@ st.divider()
 st.subheader("Target Job Description")
 
 # Tabs for JD input method
-tab_labels = ["📂 Upload Job Description", "✍️ Paste Job Description"]
+tab_labels = ["📂 Upload Job Description", "✍️ Paste Job Description", "📑 Rank Multiple Job Descriptions"]
 if "jobmatcher_jd_tab_selected" not in st.session_state:
     st.session_state.jobmatcher_jd_tab_selected = 0 # Default to upload tab
 
@@ -62,6 +73,7 @@ if selected_tab != tab_labels[st.session_state.jobmatcher_jd_tab_selected]:
     st.rerun()
 
 jd_text = None
+jd_batch = {}
 if selected_tab == "📂 Upload Job Description":
     st.write("")
     jd_file = st.file_uploader("Upload the Job Description (PDF or DOCX)", type=["pdf", "docx"], key="jobmatcher_jd_uploader")
@@ -85,6 +97,38 @@ elif selected_tab == "✍️ Paste Job Description":
     if pasted_text:
         jd_text = pasted_text
 
+elif selected_tab == "📑 Rank Multiple Job Descriptions":
+    st.write("")
+    jd_files = st.file_uploader("Upload Job Descriptions (PDF, DOCX or TXT)", type=["pdf", "docx", "txt"], accept_multiple_files=True, key="jobmatcher_jd_multi_uploader")
+    pasted_batch = st.text_area("Or paste Job Descriptions, separated by a line containing only ---", height=200, key="jobmatcher_jd_multi_pasted_text")
+    use_samples = st.checkbox("Include the bundled sample Job Descriptions", key="jobmatcher_jd_use_samples")
+
+    with st.spinner("Processing job descriptions..."):
+        for jd_file in jd_files or []:
+            jd_batch[jd_file.name] = parser.extract_text_from_uploaded_file(jd_file)
+        pasted_jds = [chunk.strip() for chunk in pasted_batch.split("\n---\n") if chunk.strip()]
+        for i, chunk in enumerate(pasted_jds):
+            jd_batch[f"Pasted JD {i + 1}"] = chunk
+        if use_samples:
+            jd_batch.update({f"Sample: {name}": text for name, text in load_sample_job_descriptions().items()})
+    jd_batch = {name: text for name, text in jd_batch.items() if text.strip()}
+    if jd_batch:
+        st.markdown("<br>", unsafe_allow_html=True)
+        st.success(f"{len(jd_batch)} Job Description{'s' if len(jd_batch) != 1 else ''} ready for ranking!")
+
+
+# Multi-JD Ranking
+if st.session_state.resume_text_jobmatcher and jd_batch:
+    st.divider()
+    st.subheader("Job Description Ranking")
+
+    with st.spinner(f"Ranking {len(jd_batch)} job descriptions..."):
+        resume_text = st.session_state.resume_text_jobmatcher
+        jd_names, jd_texts = list(jd_batch.keys()), list(jd_batch.values())
+        results = run_job_ranking(content_hash(resume_text), tuple(map(content_hash, jd_texts)), get_skill_registry().version, resume_text, jd_texts)
+
+    st.dataframe(rank_job_matches(jd_names, results), hide_index=True, use_container_width=True)
+    st.caption("Click a column header to sort. Switch to a single Job Description for the detailed skill breakdown.")
 
 # Main Analysis Logic
 if st.session_state.resume_text_jobmatcher and jd_text:
@@ -92,52 +136,17 @@ if st.session_state.resume_text_jobmatcher and jd_text:
     st.subheader("Match Analysis Results")
 
     with st.spinner("Performing match analysis..."):
-        nlp = load_spacy_nlp_model()
-
-        resume_doc = nlp(st.session_state.resume_text_jobmatcher)
-        jd_doc = nlp(jd_text)
-
-        # Skill Matching
-        resume_hard_skills = set(extract_skills_fuzzy(resume_doc))
-        resume_soft_skills = set(extract_soft_skills_fuzzy(resume_doc))
-        jd_hard_skills_weighted, jd_soft_skills = weighted_skill_analysis(jd_text, nlp)
-
-        # jd_hard_skills_weighted is a dictionary, so .keys() is appropriate here
-        jd_hard_skills = set(jd_hard_skills_weighted.keys())
-
-        matched_hard_skills = resume_hard_skills.intersection(jd_hard_skills)
-        missing_hard_skills = jd_hard_skills.difference(resume_hard_skills)
-        matched_soft_skills = resume_soft_skills.intersection(jd_soft_skills)
-        missing_soft_skills = jd_soft_skills.difference(resume_soft_skills)
-
-        # Score Generation
-        total_jd_hard_weight = sum(jd_hard_skills_weighted.values())
-        matched_hard_weight = sum(jd_hard_skills_weighted[s] for s in matched_hard_skills)
-
-        hard_pct = (matched_hard_weight / total_jd_hard_weight) * 100 if total_jd_hard_weight else 0
-        soft_pct = (len(matched_soft_skills) / len(jd_soft_skills)) * 100 if jd_soft_skills else 0
-
-        # Define weighting for overall score
-        hard_score_contribution = hard_pct * 0.9 # Hard skills contribute 90%
-        soft_score_contribution = soft_pct * 0.1 # Soft skills contribute 10%
+        resume_text = st.session_state.resume_text_jobmatcher
+        match = run_job_match(content_hash(resume_text), content_hash(jd_text), get_skill_registry().version, resume_text, jd_text)
 
-        final_score = round(hard_score_contribution + soft_score_contribution)
+        final_score = match.final_score
+        hard_pct, soft_pct = match.hard_pct, match.soft_pct
+        hard_score_contribution, soft_score_contribution = match.hard_score_contribution, match.soft_score_contribution
+        matched_soft_skills, missing_soft_skills = match.matched_soft_skills, match.missing_soft_skills
 
         # Categorize hard skills for display
-        def categorize(skills_dict):
-            core, imp, opt = [], [], []
-            for s, w in skills_dict.items():
-                if w >= 2.5: core.append(s)
-                elif w >= 1.0: imp.append(s)
-                else: opt.append(s)
-            return sorted(core), sorted(imp), sorted(opt)
-
-        matched_hard_core, matched_hard_imp, matched_hard_opt = categorize(
-            {s: jd_hard_skills_weighted[s] for s in matched_hard_skills}
-        )
-        missing_hard_core, missing_hard_imp, missing_hard_opt = categorize(
-            {s: jd_hard_skills_weighted[s] for s in missing_hard_skills}
-        )
+        matched_hard_core, matched_hard_imp, matched_hard_opt = match.matched_hard_buckets()
+        missing_hard_core, missing_hard_imp, missing_hard_opt = match.missing_hard_buckets()
 
         # Display Results
         st.header("📊 Job Compatibility Score")
@@ -198,9 +207,9 @@ if st.session_state.resume_text_jobmatcher and jd_text:
         st.divider()
         st.header("📚 Recommended Resources for Missing Skills")
         st.write("")
-        all_missing_skills = list(missing_hard_skills) + list(missing_soft_skills)
+        all_missing_skills = match.all_missing_skills
         if all_missing_skills:
-            learning_resources(all_missing_skills)
+            learning_resources(all_missing_skills, match.resume_skill_ids)
         else:
             st.info("You've got all the essential skills covered for this role!")
 
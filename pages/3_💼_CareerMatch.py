@@ -92,6 +92,9 @@ if uploaded_file is not None:
                 st.markdown("##### No description available.")
             st.markdown("##### Matched Skills:")
             st.markdown("#### " + " ".join(f":blue-badge[{skill}]" for skill in job['matched_skills']))
+            if job.get("adjacent_roles"):
+                st.markdown("##### Also Consider:")
+                st.markdown("#### " + " ".join(f":violet-badge[{role}]" for role in job['adjacent_roles']))
             st.markdown("<br>", unsafe_allow_html=True)
     else:
         st.write("No jobs found matching your skills.")
@@ -1,10 +1,12 @@
 import streamlit as st # type: ignore
 import ui.render_footer as footer
 import ui.render_header as header
-import json
+import numpy as np
 import preprocessor.parser as parser
-from preprocessor.skills import extract_skills_fuzzy
+from preprocessor.skills import extract_skill_ids
+from preprocessor.skill_registry import get_skill_registry
 from recommender.resources import learning_resources
+from recommender.learning_path import rank_missing_skills
 from preprocessor.spacy_nlp import load_spacy_nlp_model
 
 #Page configuration
@@ -26,13 +28,8 @@ st.divider()
 resume_file = st.file_uploader("Upload your resume (PDF or DOCX)", type=["pdf", "docx"])
 
 # Load Job Roles
-@st.cache_data
-def load_job_roles():
-    with open("data/dataset/job_to_skill.json", "r") as f:
-        return json.load(f)
-
-job_skills_map = load_job_roles()
-available_roles = sorted(job_skills_map.keys())
+registry = get_skill_registry()
+available_roles = sorted(registry.catalogue_roles())
 
 # Resume Extraction and Analysis
 if resume_file:
@@ -49,15 +46,16 @@ if resume_file:
         nlp = load_spacy_nlp_model()
 
         resume_doc = nlp(resume_text)
-        extracted_skills = set(extract_skills_fuzzy(resume_doc))
+        extracted_skill_ids = extract_skill_ids(resume_doc)
 
     # Role Selection
     st.divider()
     selected_role = st.selectbox("Select a target job role:", available_roles)
     if selected_role:
-        required_skills = set(job_skills_map[selected_role])
-        matched_skills = extracted_skills & required_skills
-        missing_skills = required_skills - extracted_skills
+        required_skill_ids = registry.role_skill_ids(selected_role)
+        required_skills = registry.skill_names_of(required_skill_ids)
+        matched_skills = registry.skill_names_of(np.intersect1d(required_skill_ids, extracted_skill_ids))
+        missing_skills = registry.skill_names_of(np.setdiff1d(required_skill_ids, extracted_skill_ids))
 
         st.divider()
         st.markdown(f"## 🎯 Skill Match for: {selected_role}")
@@ -68,12 +66,12 @@ if resume_file:
         st.markdown("<br>", unsafe_allow_html=True)
 
         st.markdown(f"#### 💡 Recommended Additional Skills: <span style='font-weight:normal'>({len(missing_skills)} skill{'s' if len(missing_skills) != 1 else ''})</span>", unsafe_allow_html=True)
-        st.markdown("#### " + " ".join(f":blue-badge[{skill}]" for skill in sorted(missing_skills)) or "_None_")
+        st.markdown("#### " + " ".join(f":blue-badge[{skill}]" for skill in rank_missing_skills(missing_skills, extracted_skill_ids)) or "_None_")
 
         st.divider()
         if missing_skills:
             st.markdown("### 📚 Recommended Resources for Additional Skills")
-            learning_resources(missing_skills)
+            learning_resources(missing_skills, tuple(extracted_skill_ids.tolist()))
         else:
             st.success("You're fully equipped for this role! 💼")
 # Footer
@@ -2,9 +2,9 @@ import streamlit as st  # type: ignore
 from builder import form_inputs, generator_standard, resume_enhancer
 import ui.render_footer as footer
 import ui.render_header as header
+from llm.quota import quota_status_message
 import re
 from io import BytesIO
-import time # Import the time module for delays
 
 # Page configuration
 st.set_page_config(page_title="ResumeBuilder", page_icon="📝", layout="centered", initial_sidebar_state="collapsed")
@@ -45,6 +45,17 @@ selected_tone = st.selectbox(
     key="ai_tone_select",
     help="Choose the tone for AI-enhanced sections (Summary, Responsibilities, Projects, Skills, Achievements)."
 )
+single_ai_request = st.checkbox(
+    "Enhance all sections in one AI request",
+    value=True,
+    key="ai_single_request",
+    help="Faster and uses less quota. Any section the combined answer gets wrong is retried on its own."
+)
+fresh_ai_output = st.checkbox(
+    "Fresh AI rewrite (ignore cached results)",
+    key="ai_fresh_output",
+    help="Unchanged sections normally reuse their previous AI rewrite instantly. Tick this to ask Gemini again."
+)
 st.divider()
 
 # Display dynamic form based on counts
@@ -184,56 +195,86 @@ if generate_standard or generate_ai_enhanced:
                 st.warning("No Gemini API key provided. An unenhanced resume will be generated.")
                 generate_ai_enhanced = False # Disable enhancement for this run
 
-            # Process Summary
-            if generate_ai_enhanced and gemini_api_key and summary:
-                processed_summary = resume_enhancer.enhance_content_with_gemini(
-                    "professional summary", summary, selected_tone, gemini_api_key
+            # Every section to enhance goes out concurrently, paced by the API key's quota governor
+            jobs = []
+            if generate_ai_enhanced and gemini_api_key:
+                if summary:
+                    jobs.append(("summary", None, "professional summary", summary))
+                for i, exp_entry in enumerate(experience):
+                    if exp_entry:
+                        jobs.append(("experience", i, "job responsibility", "\n".join(exp_entry["responsibilities"])))
+                for i, proj_entry in enumerate(projects):
+                    if proj_entry:
+                        jobs.append(("project", i, "project description", proj_entry["description"]))
+                if skills:
+                    # Combine technical and soft skills into a single string for enhancement
+                    jobs.append(("skills", None, "skills section", ", ".join(skills["technical"] + skills["soft"])))
+                if extras["achievements"]:
+                    # Join all achievements into a single string for enhancement
+                    jobs.append(("achievements", None, "achievements", "\n".join(extras["achievements"])))
+
+            enhanced = {}
+            if jobs:
+                # Other sessions sharing the key may already be queued
+                quota_note = quota_status_message(gemini_api_key)
+                if quota_note:
+                    st.caption(f"⏳ {quota_note}")
+                progress = st.progress(0.0, text=f"Enhancing {len(jobs)} sections...")
+
+                def report_progress(done, total, section_name):
+                    progress.progress(done / total, text=f"Enhanced {section_name} ({done}/{total})")
+
+                enhance = resume_enhancer.enhance_sections_batched if single_ai_request else resume_enhancer.enhance_sections
+                usage = {}
+                results = enhance(
+                    [(section_name, text) for _, _, section_name, text in jobs],
+                    selected_tone, gemini_api_key, bypass_cache=fresh_ai_output, on_progress=report_progress, usage=usage
                 )
-                time.sleep(3) # Add delay to respect API rate limits
+                progress.empty()
+                # Nothing is sent for sections answered from the cache
+                if usage.get("calls"):
+                    st.caption(
+                        f"{usage['calls']} AI request{'s' if usage['calls'] > 1 else ''} used ~{usage['input_tokens']} input "
+                        f"and ~{usage['output_tokens']} output tokens (estimated)."
+                    )
+                for (kind, i, _, _), (text, problem) in zip(jobs, results):
+                    if problem:
+                        level, message = problem
+                        getattr(st, level)(message)
+                    else:
+                        enhanced[(kind, i)] = text
+
+            # Process Summary
+            processed_summary = enhanced.get(("summary", None), summary)
 
             # Process Work Experience
             for i, exp_entry in enumerate(experience):
                 current_exp = exp_entry.copy()
                 
-                if generate_ai_enhanced and gemini_api_key and experience[i]:
-                    enhanced_resp_text = resume_enhancer.enhance_content_with_gemini(
-                        "job responsibility", "\n".join(current_exp["responsibilities"]), selected_tone, gemini_api_key
-                    )
-                    current_exp["responsibilities"] = [line.strip() for line in enhanced_resp_text.split('\n') if line.strip()] 
+                if ("experience", i) in enhanced:
+                    current_exp["responsibilities"] = [line.strip() for line in enhanced[("experience", i)].split('\n') if line.strip()] 
                 elif isinstance(current_exp["responsibilities"], list):
                     current_exp["responsibilities"] = [r.strip() for r in current_exp["responsibilities"] if r.strip()] # Clean list elements
                 
                 processed_experience.append(current_exp)
-                if generate_ai_enhanced and gemini_api_key:
-                    time.sleep(3) # Add delay after each experience enhancement
 
             # Process Projects
             for i, proj_entry in enumerate(projects):
                 current_proj = proj_entry.copy()
 
-                if generate_ai_enhanced and gemini_api_key and projects[i]:
-                    enhanced_desc_text = resume_enhancer.enhance_content_with_gemini(
-                        "project description", current_proj["description"], selected_tone, gemini_api_key
-                    )
-                    current_proj["description"] = [line.strip() for line in enhanced_desc_text.split('\n') if line.strip()]
+                if ("project", i) in enhanced:
+                    current_proj["description"] = [line.strip() for line in enhanced[("project", i)].split('\n') if line.strip()]
                 elif isinstance(current_proj["description"], str):
                     current_proj["description"] = [line.strip() for line in current_proj["description"].split('\n') if line.strip()]
 
                 processed_projects.append(current_proj)
-                if generate_ai_enhanced and gemini_api_key:
-                    time.sleep(3) # Add delay after each project enhancement
 
             # Process Skills
-            if generate_ai_enhanced and gemini_api_key and skills:
-                # Combine technical and soft skills into a single string for enhancement
-                all_skills_text = ", ".join(skills["technical"] + skills["soft"])
-                enhanced_skills_string = resume_enhancer.enhance_content_with_gemini(
-                    "skills section", all_skills_text, selected_tone, gemini_api_key
-                )
+            if ("skills", None) in enhanced:
                 # Parse the specific output format: "Technical Skills: ..., Soft Skills: ..."
                 tech_skills = []
                 soft_skills = []
-                lines = enhanced_skills_string.split('\n')
+                lines = enhanced[("skills", None)].split('\n')
                 for line in lines:
                     if line.startswith("Technical Skills:"):
                         tech_str = line.replace("Technical Skills:", "").strip()
@@ -243,7 +284,6 @@ if generate_standard or generate_ai_enhanced:
                         soft_skills = [s.strip() for s in soft_str.split(',') if s.strip()]
                 
                 processed_skills = {"technical": tech_skills, "soft": soft_skills}
-                time.sleep(3) # Add delay after skills enhancement
             else:
                 # Ensure skills are lists for generator
                 processed_skills["technical"] = [s.strip() for s in processed_skills["technical"] if s.strip()]
@@ -251,13 +291,8 @@ if generate_standard or generate_ai_enhanced:
 
 
             # Process Achievements
-            if generate_ai_enhanced and gemini_api_key and extras["achievements"]:
-                # Join all achievements into a single string for enhancement
-                all_achievements_text = "\n".join(extras["achievements"])
-                enhanced_achievements_string = resume_enhancer.enhance_content_with_gemini(
-                    "achievements", all_achievements_text, selected_tone, gemini_api_key
-                )
-                processed_extras["achievements"] = [a.strip() for a in enhanced_achievements_string.split(',') if a.strip()]
+            if ("achievements", None) in enhanced:
+                processed_extras["achievements"] = [a.strip() for a in enhanced[("achievements", None)].split(',') if a.strip()]
             else:
                 processed_extras["achievements"] = [a.strip() for a in processed_extras["achievements"] if a.strip()]
 
@@ -276,7 +311,7 @@ if generate_standard or generate_ai_enhanced:
 
         # Generate and display resume
         try:
-            docx_buffer = generator_standard.generate_structured_resume(data, "data/template.docx")
+            docx_buffer = generator_standard.generate_structured_resume(data, "builder/template.docx")
             
             if warnings:
                 st.write("")
@@ -2,10 +2,16 @@ import streamlit as st
 import ui.render_footer as footer
 import ui.render_header as header
 from analyzer.analysis_enhancer import (
+    AiResponseError,
+    HYBRID_AI_CATEGORIES,
+    LOCAL_CHECK_CATEGORIES,
     get_gemini_api_key,
-    perform_ai_ats_analysis
+    stream_ai_ats_analysis,
+    stream_hybrid_ats_analysis
 )
-from analyzer.resume_analysis import run_local_ats_analysis
+from analyzer.incremental_analysis import IncrementalAtsAnalyzer
+from llm.resilience import is_provider_failure
+from llm.quota import QuotaExceededError, quota_status_message
 from preprocessor.parser import extract_text_from_uploaded_file
 
 # Page configuration
@@ -15,6 +21,40 @@ st.logo("ui/assets/header.png", size="large", icon_image="ui/assets/logo.png")
 # Header
 header.render_header()
 
+
+def render_ats_score(ats_score):
+    st.markdown(f"### 🧠 ATS Compatibility Score: **{ats_score}/100**")
+    st.progress(min(int(ats_score), 100), text = "ATS Score")
+    if ats_score >= 80:
+        st.success("Excellent! Your resume is highly ATS-compatible.")
+    elif ats_score >= 60:
+        st.info("Good, but there's room for improvement.")
+    else:
+        st.warning("Needs improvement. Follow the suggestions below.")
+
+
+def run_local_checks(resume_text, uploaded_file):
+    # One analyzer per session: re-checks after an edit only re-parse the changed sentences
+    if "ats_analyzer" not in st.session_state:
+        st.session_state.ats_analyzer = IncrementalAtsAnalyzer()
+    analyzer = st.session_state.ats_analyzer
+    local_feedback = analyzer.analyze(resume_text, uploaded_file.name, uploaded_file.size).sections
+    segments, reparsed = analyzer.last_run
+    if reparsed < segments:
+        st.caption(f"Re-checked {reparsed} changed of {segments} sentence groups; the rest reused from your last check.")
+    return local_feedback
+
+
+def render_local_analysis(resume_text, uploaded_file):
+    for step in run_local_checks(resume_text, uploaded_file):
+        st.markdown(f"### 🧩 Step {step['step']}: {step['title']}")
+        for level, msg in step["findings"]:
+            if level == "warning":
+                st.warning(msg)
+            else:
+                st.success(msg)
+
+
 # Sidebar
 st.sidebar.title("ATS TuneUp")
 st.sidebar.markdown("Analyze your resume for Applicant Tracking System (ATS) compatibility using expert-crafted rules and AI enhancement.")
@@ -35,6 +75,11 @@ api_key = get_gemini_api_key()
 col1, col2 = st.columns([1, 1])
 run_local = col1.button("🔍 ATS Analysis", use_container_width=True)
 run_ai = col2.button("✨ AI Enhanced Analysis", use_container_width=True)
+hybrid_ai = st.checkbox(
+    "Quick AI analysis (rule-based checks + AI review of judgment calls)", value=True,
+    help="Rule-based checks answer the categories they can; the AI only reviews " + ", ".join(HYBRID_AI_CATEGORIES).lower() + ", which is faster.",
+)
+fresh_ai = st.checkbox("Fresh AI answer (ignore cached analysis)", help="Re-analyzing an unchanged resume normally returns the previous AI answer instantly.")
 
 if uploaded_file:
     resume_text = extract_text_from_uploaded_file(uploaded_file)
@@ -44,14 +89,7 @@ if uploaded_file:
         st.subheader("🔍 ATS Analysis Results")
         st.write("")
         with st.spinner("Analyzing resume..."):
-            local_feedback = run_local_ats_analysis(resume_text, uploaded_file)
-            for step in local_feedback:
-                st.markdown(f"### 🧩 Step {step['step']}: {step['title']}")
-                for level, msg in step["findings"]:
-                    if level == "warning":
-                        st.warning(msg)
-                    else:
-                        st.success(msg)
+            render_local_analysis(resume_text, uploaded_file)
             
             st.divider()
             st.write("")
@@ -74,25 +112,29 @@ if uploaded_file:
         else:
             st.subheader("✨ AI Enhanced ATS Analysis")
             st.write("")
-            with st.spinner("AI is reviewing your resume..."):
-                ai_feedback = perform_ai_ats_analysis(resume_text, api_key)
-
-                # Display ATS score if present
-                ats_score = ai_feedback.get("ATS_Score")
-                if ats_score is not None:
-                    st.markdown(f"### 🧠 ATS Compatibility Score: **{ats_score}/100**")
-                    st.progress(min(int(ats_score), 100), text = "ATS Score")
-                    if ats_score >= 80:
-                        st.success("Excellent! Your resume is highly ATS-compatible.")
-                    elif ats_score >= 60:
-                        st.info("Good, but there's room for improvement.")
-                    else:
-                        st.warning("Needs improvement. Follow the suggestions below.")
-
-                # Render all category feedback
-                for category, results in ai_feedback.items():
+            # The score is placed first on the page, whenever it arrives in the stream
+            score_slot = st.container()
+            progress_note = st.empty()
+            quota_note = quota_status_message(api_key)
+            progress_note.caption("⏳ AI is reviewing your resume... categories appear as they are ready." + (f" {quota_note}" if quota_note else ""))
+            # Categories from the model so far (hybrid mode shows the rule-based ones first)
+            shown = 0
+            ai_failed = False
+            usage = {}
+            try:
+                if hybrid_ai:
+                    local_sections = run_local_checks(resume_text, uploaded_file)
+                    ai_stream = stream_hybrid_ats_analysis(resume_text, api_key, local_sections, bypass_cache=fresh_ai, usage=usage)
+                else:
+                    ai_stream = stream_ai_ats_analysis(resume_text, api_key, bypass_cache=fresh_ai, usage=usage)
+                # Each category is rendered as soon as it is ready (rule-based ones at once)
+                for category, results in ai_stream:
                     if category == "ATS_Score":
+                        with score_slot:
+                            render_ats_score(results)
                         continue
+                    if not (hybrid_ai and category in LOCAL_CHECK_CATEGORIES.values()):
+                        shown += 1
                     st.markdown(f"### 🎗️ {category}")
                     positives = results.get("Positives", [])
                     negatives = results.get("Negatives", [])
@@ -100,20 +142,50 @@ if uploaded_file:
                         st.success(pos)
                     for neg in negatives:
                         st.warning(neg)
-                
-                st.divider()
-                st.write("")
-                st.info("""We recommend the use of other online ATS Analysis tools as sometimes some tools provide new insights that the others do not. Some of the recommended tools are listed below:""")
-                cols = st.columns([1, 1, 1], vertical_alignment='center', gap='small')
-                with cols[0]:
-                    st.link_button("Weekday", "https://www.weekday.works/resume-checker-and-scoring-tool", use_container_width= True)
-                    st.link_button("MyPerfectResume", "https://www.myperfectresume.com/resume/ats-resume-checker", use_container_width= True)
-                with cols[1]:
-                    st.link_button("Resume-Now", "https://www.resume-now.com/build-resume?mode=ats", use_container_width= True)
-                    st.link_button("Enhancv", "https://enhancv.com/resources/resume-checker/", use_container_width= True)
-                with cols[2]:
-                    st.link_button("Jobscan", "https://www.jobscan.co/", use_container_width= True)
-                    st.link_button("1MillionResume", "https://1millionresume.com/resume-checker", use_container_width= True)
+            except AiResponseError as err:
+                progress_note.empty()
+                st.error(str(err))
+                if err.payload:
+                    st.code(err.payload, language="json")
+                st.stop()
+            except QuotaExceededError as err:
+                progress_note.empty()
+                st.error(f"🚨 {err} The rule-based ATS Analysis is still available.")
+                st.stop()
+            except Exception as e:
+                progress_note.empty()
+                if not is_provider_failure(e) or shown:
+                    st.error(f"❌ Unexpected error during AI analysis: {e}")
+                    st.stop()
+                # The provider is down or not answering: fall back to the local rule-based analysis
+                ai_failed = True
+                if hybrid_ai:
+                    st.warning(f"⚠️ AI review is unavailable right now ({e}). The rule-based results above still apply.")
+                else:
+                    st.warning(f"⚠️ AI analysis is unavailable right now ({e}). Showing the rule-based ATS analysis instead.")
+                    render_local_analysis(resume_text, uploaded_file)
+            progress_note.empty()
+            # Nothing is sent when the answer comes from the cache
+            if not ai_failed and usage.get("cached") is False:
+                st.caption(
+                    f"Sent ~{usage['sent_tokens']} tokens of resume text (~{usage['raw_tokens']} before clean-up)"
+                    + ("; the end of a very long resume was left out." if usage["truncated"] else ".")
+                    + (f" The request used ~{usage['input_tokens']} input and ~{usage['output_tokens']} output tokens (estimated)." if usage.get("calls") else "")
+                )
+
+            st.divider()
+            st.write("")
+            st.info("""We recommend the use of other online ATS Analysis tools as sometimes some tools provide new insights that the others do not. Some of the recommended tools are listed below:""")
+            cols = st.columns([1, 1, 1], vertical_alignment='center', gap='small')
+            with cols[0]:
+                st.link_button("Weekday", "https://www.weekday.works/resume-checker-and-scoring-tool", use_container_width= True)
+                st.link_button("MyPerfectResume", "https://www.myperfectresume.com/resume/ats-resume-checker", use_container_width= True)
+            with cols[1]:
+                st.link_button("Resume-Now", "https://www.resume-now.com/build-resume?mode=ats", use_container_width= True)
+                st.link_button("Enhancv", "https://enhancv.com/resources/resume-checker/", use_container_width= True)
+            with cols[2]:
+                st.link_button("Jobscan", "https://www.jobscan.co/", use_container_width= True)
+                st.link_button("1MillionResume", "https://1millionresume.com/resume-checker", use_container_width= True)
 else:
     st.info("Please upload your resume above to begin analysis.")
 
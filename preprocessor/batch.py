@@ -0,0 +1,24 @@
+import os
+
+RESUME_EXTENSIONS = (".pdf", ".docx")
+
+
+def find_resumes(root, recursive=False):
+    """Every PDF/DOCX in `root` (and its subfolders if `recursive`), in a stable order."""
+    if recursive:
+        paths = (os.path.join(dirpath, name) for dirpath, _, names in os.walk(root) for name in names)
+    else:
+        paths = (os.path.join(root, name) for name in os.listdir(root))
+    return sorted(path for path in paths if path.lower().endswith(RESUME_EXTENSIONS) and os.path.isfile(path))
+
+
+def init_pool_worker(setup=None, *args):
+    """
+    Process-pool initializer for the batch tools. Parallelism comes from the pool, so each
+    worker matches skills on a single thread; `setup(*args)` then loads the worker's own state.
+    """
+    import preprocessor.skills as skills # Only pool workers pay for the skill matcher's imports here
+
+    skills.MATCH_WORKERS = 1
+    if setup is not None:
+        setup(*args)
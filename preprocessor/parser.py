@@ -3,13 +3,13 @@ from pathlib import Path
 from docx import Document # type: ignore
 import streamlit as st
 
+# Separates the pages of extracted PDF text (whitespace to regexes and spaCy, a line break to splitlines)
+PAGE_BREAK = "\f"
+
 def extract_text_from_pdf(pdf_bytes):
-    """Extract text from PDF using PyMuPDF."""
+    """Extract text from PDF using PyMuPDF, with PAGE_BREAK between pages."""
     doc = fitz.open(stream = pdf_bytes, filetype = "pdf")
-    text = ""
-    for page in doc:
-        text += page.get_text() # type: ignore
-    return text
+    return PAGE_BREAK.join(page.get_text() for page in doc) # type: ignore
 
 def extract_text_from_docx(docx_bytes):
     from io import BytesIO
@@ -17,10 +17,24 @@ def extract_text_from_docx(docx_bytes):
     text = "\n".join([para.text for para in document.paragraphs])
     return text
 
+def extract_text_from_path(path):
+    """Same dispatch as extract_text_from_uploaded_file, for files on disk."""
+    suffix = Path(path).suffix.lower()
+    if suffix == ".pdf":
+        return extract_text_from_pdf(Path(path).read_bytes())
+    elif suffix == ".docx":
+        return extract_text_from_docx(Path(path).read_bytes())
+    elif suffix == ".txt":
+        return Path(path).read_text(encoding="utf-8", errors="ignore")
+    else:
+        return ""
+
 def extract_text_from_uploaded_file(uploaded_file):
     if uploaded_file.name.endswith(".pdf"):
         return extract_text_from_pdf(uploaded_file.read())
     elif uploaded_file.name.endswith(".docx"):
         return extract_text_from_docx(uploaded_file.read())
+    elif uploaded_file.name.endswith(".txt"):
+        return uploaded_file.read().decode("utf-8", errors="ignore")
     else:
         return ""
\ No newline at end of file
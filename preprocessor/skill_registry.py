@@ -0,0 +1,201 @@
+import os
+import json
+import hashlib
+from functools import lru_cache
+import numpy as np
+
+SKILLS_PATH = "data/dataset/skills.json"
+SOFT_SKILLS_PATH = "data/dataset/soft_skills.json"
+SKILL_TO_JOB_PATH = "data/dataset/skill_to_job.json"
+JOB_TO_SKILL_PATH = "data/dataset/job_to_skill.json"
+DATASET_PATHS = (SKILLS_PATH, SOFT_SKILLS_PATH, SKILL_TO_JOB_PATH, JOB_TO_SKILL_PATH)
+
+# Skill and role IDs fit comfortably in 32 bits; ID vectors use this dtype everywhere
+ID_DTYPE = np.int32
+
+
+def _key(name: str):
+    return name.lower().strip()
+
+
+class _Interner:
+    """Assigns one integer ID per case-insensitive name, remembering every spelling seen."""
+
+    def __init__(self):
+        self.names = []
+        self.ids = {}
+        self.spellings = {}
+
+    def intern(self, name: str):
+        key = _key(name)
+        idx = self.ids.get(key)
+        if idx is None:
+            idx = len(self.names)
+            self.ids[key] = idx
+            self.names.append(name.strip())
+            self.spellings[idx] = set()
+        self.spellings[idx].add(name.strip())
+        return idx
+
+
+def _alias_table(canonical_map, interner):
+    # Later canonicals overwrite earlier ones for a shared alias, exactly like the old alias dicts
+    alias_to_id = {}
+    for canonical, aliases in canonical_map.items():
+        canonical_id = interner.intern(canonical)
+        for alias in aliases:
+            alias_to_id[_key(alias)] = canonical_id
+    return list(alias_to_id.keys()), np.fromiter(alias_to_id.values(), dtype=ID_DTYPE, count=len(alias_to_id))
+
+
+class SkillRegistry:
+    """
+    Interns every canonical skill and job role across the datasets to compact integer IDs.
+    Names join case-insensitively; anything that fails to join is collected in `mismatches`.
+    """
+
+    def __init__(self, skills_map, soft_skills_map, skill_to_job, job_to_skill, version=""):
+        # Content hash of the datasets, for keying caches of anything derived from the lexicon
+        self.version = version
+
+        skills = _Interner()
+        roles = _Interner()
+
+        # Load order decides the display spelling: skills.json wins, then soft_skills.json
+        self.hard_aliases, self.hard_alias_ids = _alias_table(skills_map, skills)
+        self.soft_aliases, self.soft_alias_ids = _alias_table(soft_skills_map, skills)
+
+        role_links = [(roles.intern(role), skills.intern(skill)) for role, role_skills in job_to_skill.items() for skill in role_skills]
+        skill_links = [(skills.intern(skill), roles.intern(role)) for skill, skill_roles in skill_to_job.items() for role in skill_roles]
+
+        self.skill_names = skills.names
+        self.role_names = roles.names
+        self._skill_ids = skills.ids
+        self._role_ids = roles.ids
+
+        n_skills, n_roles = len(self.skill_names), len(self.role_names)
+
+        self.is_soft = np.zeros(n_skills, dtype=bool)
+        self.is_soft[[skills.ids[_key(s)] for s in soft_skills_map]] = True
+
+        # job_to_skill as a role × skill incidence matrix (the role catalogue)
+        self.role_skills = np.zeros((n_roles, n_skills), dtype=bool)
+        for role_id, skill_id in role_links:
+            self.role_skills[role_id, skill_id] = True
+
+        # skill_to_job as a skill × role incidence matrix (used for recommendations)
+        self.skill_roles = np.zeros((n_skills, n_roles), dtype=bool)
+        for skill_id, role_id in skill_links:
+            self.skill_roles[skill_id, role_id] = True
+
+        # Each role's position in a skill's skill_to_job list (n_roles where absent), for ordering ties as the lists do,
+        # and the role spelled as skill_to_job first spells it, which is how recommendations title it
+        self.skill_role_rank = np.full((n_skills, n_roles), n_roles, dtype=ID_DTYPE)
+        recommended = {}
+        for skill, skill_roles in skill_to_job.items():
+            skill_id = skills.ids[_key(skill)]
+            for rank, role in enumerate(skill_roles):
+                role_id = roles.ids[_key(role)]
+                recommended.setdefault(role_id, role)
+                self.skill_role_rank[skill_id, role_id] = min(self.skill_role_rank[skill_id, role_id], rank)
+
+        self.recommended_role_names = [recommended.get(role_id, name) for role_id, name in enumerate(roles.names)]
+
+        self.catalogue_role_ids = np.fromiter((roles.ids[_key(r)] for r in job_to_skill), dtype=ID_DTYPE, count=len(job_to_skill))
+
+        self.mismatches = self._join_report(skills, roles, skills_map, soft_skills_map, skill_to_job, job_to_skill)
+
+    # ID lookups
+    def skill_id(self, name: str):
+        return self._skill_ids.get(_key(name), -1)
+
+    def skill_ids(self, names):
+        """Sorted, de-duplicated ID vector for the given names; unknown names are dropped."""
+        ids = {self._skill_ids[k] for k in map(_key, names) if k in self._skill_ids}
+        return np.fromiter(sorted(ids), dtype=ID_DTYPE, count=len(ids))
+
+    def ordered_skill_ids(self, names):
+        """ID vector for the given names in the order first seen, de-duplicated; unknown names are dropped."""
+        ids = dict.fromkeys(self._skill_ids[k] for k in map(_key, names) if k in self._skill_ids)
+        return np.fromiter(ids, dtype=ID_DTYPE, count=len(ids))
+
+    def skill_names_of(self, ids):
+        return [self.skill_names[i] for i in ids]
+
+    def role_id(self, name: str):
+        return self._role_ids.get(_key(name), -1)
+
+    def role_skill_ids(self, role: str):
+        role_id = self.role_id(role)
+        if role_id < 0:
+            return np.empty(0, dtype=ID_DTYPE)
+        return np.flatnonzero(self.role_skills[role_id]).astype(ID_DTYPE)
+
+    def catalogue_roles(self):
+        """Role names from job_to_skill.json, in file order."""
+        return [self.role_names[i] for i in self.catalogue_role_ids]
+
+    # Join diagnostics
+    def _join_report(self, skills, roles, skills_map, soft_skills_map, skill_to_job, job_to_skill):
+        hard_keys = set(map(_key, skills_map))
+        soft_keys = set(map(_key, soft_skills_map))
+        s2j_keys = set(map(_key, skill_to_job))
+        j2s_keys = {_key(s) for role_skills in job_to_skill.values() for s in role_skills}
+        s2j_role_keys = {_key(r) for skill_roles in skill_to_job.values() for r in skill_roles}
+        j2s_role_keys = set(map(_key, job_to_skill))
+
+        def skill_list(keys):
+            return sorted(self.skill_names[skills.ids[k]] for k in keys)
+
+        def role_list(keys):
+            return sorted(self.role_names[roles.ids[k]] for k in keys)
+
+        links_only_in_s2j = self.skill_roles & ~self.role_skills.T
+        links_only_in_j2s = self.role_skills.T & ~self.skill_roles
+
+        return {
+            "skill spelling differs between files": sorted(" / ".join(sorted(v)) for v in skills.spellings.values() if len(v) > 1),
+            "role spelling differs between files": sorted(" / ".join(sorted(v)) for v in roles.spellings.values() if len(v) > 1),
+            "skill_to_job.json skills missing from skills.json": skill_list(s2j_keys - hard_keys - soft_keys),
+            "job_to_skill.json skills missing from skills.json": skill_list(j2s_keys - hard_keys - soft_keys),
+            "skills.json skills with no roles in skill_to_job.json": skill_list(hard_keys - s2j_keys),
+            "skills listed as both hard and soft": skill_list(hard_keys & soft_keys),
+            "roles only in skill_to_job.json": role_list(s2j_role_keys - j2s_role_keys),
+            "roles only in job_to_skill.json": role_list(j2s_role_keys - s2j_role_keys),
+            "skill → role links only in skill_to_job.json": [f"{self.skill_names[s]} → {self.role_names[r]}" for s, r in zip(*np.nonzero(links_only_in_s2j))],
+            "skill → role links only in job_to_skill.json": [f"{self.skill_names[s]} → {self.role_names[r]}" for s, r in zip(*np.nonzero(links_only_in_j2s))],
+        }
+
+    def join_report(self):
+        """Human-readable summary of every name that does not join cleanly across the datasets."""
+        lines = [f"{len(self.skill_names)} skills, {len(self.role_names)} roles interned"]
+        for issue, names in self.mismatches.items():
+            if names:
+                lines.append(f"{issue} ({len(names)}):")
+                lines.extend(f"  - {name}" for name in names)
+        return "\n".join(lines)
+
+
+@lru_cache(maxsize=1)
+def _load_skill_registry(signature):
+    maps = []
+    digest = hashlib.sha256()
+    for path, _ in signature:
+        with open(path, "rb") as f:
+            raw = f.read()
+        digest.update(raw)
+        maps.append(json.loads(raw.decode("utf-8")))
+    return SkillRegistry(*maps, version=digest.hexdigest()[:16])
+
+
+def get_skill_registry():
+    """
+    Returns the shared registry, loading the datasets once per process.
+    The cache is keyed on file modification times, so editing any dataset rebuilds it.
+    """
+    signature = tuple((path, os.stat(path).st_mtime_ns) for path in DATASET_PATHS)
+    return _load_skill_registry(signature)
+
+
+if __name__ == "__main__":
+    print(get_skill_registry().join_report())
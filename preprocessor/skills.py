@@ -1,36 +1,17 @@
-import json
+import numpy as np
 from rapidfuzz import process, fuzz
 from preprocessor.jd_section_parser import split_jd_sections_with_guesses, SECTION_WEIGHTS
+from preprocessor.skill_registry import get_skill_registry, ID_DTYPE
 
-# Load skill aliases as flat list
-with open("data/dataset/skills.json") as f:
-    skill_alias_map = json.load(f)
 
-skills_alias_to_canonical = {
-    alias.lower().strip(): canonical.strip()
-    for canonical, aliases in skill_alias_map.items()
-    for alias in aliases
-}
+# Lowercased alphabetic, non-stop-word tokens of a spaCy Doc: the words skill phrases are built from
+def skill_tokens(doc):
+    return [token.text.lower() for token in doc if token.is_alpha and not token.is_stop]
 
-ALL_SKILL_ALIASES = list(skills_alias_to_canonical.keys())
 
-# Load soft skills
-with open("data/dataset/soft_skills.json") as f:
-    soft_skills_map = json.load(f)
-
-sskills_alias_to_canonical = {
-    alias.lower().strip(): canonical.strip()
-    for canonical, aliases in soft_skills_map.items()
-    for alias in aliases
-}
-
-ALL_SSKILLS_ALIASES = list(sskills_alias_to_canonical.keys())
-
-
-# Generate 1- to 5-gram phrases from a spaCy Doc
-def get_ngrams(doc, max_n=5):
+# Generate 1- to 5-gram phrases from a token list
+def ngrams_from_tokens(tokens, max_n=5):
     ngrams = set()
-    tokens = [token.text.lower() for token in doc if token.is_alpha and not token.is_stop]
 
     for n in range(1, max_n + 1):
         for i in range(len(tokens) - n + 1):
@@ -40,65 +21,141 @@ def get_ngrams(doc, max_n=5):
     return ngrams
 
 
-# Resume fuzzy skill extractor → returns canonical hard skills
-def extract_skills_fuzzy(doc, threshold=90):
-    ngram_phrases = get_ngrams(doc)
-    matched_canonical = set()
+# Generate 1- to 5-gram phrases from a spaCy Doc
+def get_ngrams(doc, max_n=5):
+    return ngrams_from_tokens(skill_tokens(doc), max_n)
+
+
+# Phrases scored per cdist call; bounds the phrase × alias score matrix to a few MB
+MATCH_BATCH_SIZE = 256
+
+# Threads rapidfuzz may use per cdist call (-1 = all cores); process pools set this to 1
+MATCH_WORKERS = -1
+
+
+# Best alias for every phrase in one vectorized pass → canonical skill ID per phrase, -1 below threshold
+def _best_alias_ids(phrases, aliases, alias_ids, threshold):
+    phrases = list(phrases)
+    best_ids = np.full(len(phrases), -1, dtype=ID_DTYPE)
+
+    for start in range(0, len(phrases), MATCH_BATCH_SIZE):
+        batch = phrases[start:start + MATCH_BATCH_SIZE]
+        scores = process.cdist(batch, aliases, scorer=fuzz.token_sort_ratio, dtype=np.float64, workers=MATCH_WORKERS)
+        # argmax keeps the first best alias, the same tie-break as process.extractOne
+        best = scores.argmax(axis=1)
+        matched = scores[np.arange(len(batch)), best] >= threshold
+        best_ids[start:start + len(batch)][matched] = alias_ids[best[matched]]
+
+    return best_ids
+
+
+# Fuzzy-match each phrase to its best alias → one canonical skill ID per matching phrase
+def _match_phrases(phrases, aliases, alias_ids, threshold):
+    best_ids = _best_alias_ids(phrases, aliases, alias_ids, threshold)
+    return best_ids[best_ids >= 0]
+
+
+# Same as _match_phrases, collapsed to a sorted vector of unique IDs
+def _match_skill_ids(phrases, aliases, alias_ids, threshold):
+    return np.unique(_match_phrases(phrases, aliases, alias_ids, threshold))
+
+
+# Resume fuzzy skill extractor → canonical hard skill IDs
+def extract_skill_ids(doc, threshold=90):
+    registry = get_skill_registry()
+    return _match_skill_ids(get_ngrams(doc), registry.hard_aliases, registry.hard_alias_ids, threshold)
 
-    for phrase in ngram_phrases:
-        result = process.extractOne(phrase, ALL_SKILL_ALIASES, scorer=fuzz.token_sort_ratio)
-        if result:
-            best_alias, score, _ = result
-            if score >= threshold:
-                canonical = skills_alias_to_canonical[best_alias]
-                matched_canonical.add(canonical)
 
-    return list(matched_canonical)
+# Resume fuzzy soft skill extractor → canonical soft skill IDs
+def extract_soft_skill_ids(doc, threshold=80):
+    registry = get_skill_registry()
+    return _match_skill_ids(get_ngrams(doc), registry.soft_aliases, registry.soft_alias_ids, threshold)
+
+
+# Resume fuzzy skill extractor → returns canonical hard skills
+def extract_skills_fuzzy(doc, threshold=90):
+    return get_skill_registry().skill_names_of(extract_skill_ids(doc, threshold))
 
 
 # Resume fuzzy soft skill extractor
 def extract_soft_skills_fuzzy(doc, threshold=80):
-    ngram_phrases = get_ngrams(doc)
-    matched_canonical = set()
+    return get_skill_registry().skill_names_of(extract_soft_skill_ids(doc, threshold))
 
-    for phrase in ngram_phrases:
-        result = process.extractOne(phrase, ALL_SSKILLS_ALIASES, scorer=fuzz.token_sort_ratio)
-        if result:
-            best_alias, score, _ = result
-            if score >= threshold:
-                canonical = sskills_alias_to_canonical[best_alias]
-                matched_canonical.add(canonical)
 
-    return list(matched_canonical)
+# Resume hard and soft skill IDs for a set of phrases.
+# `cache` ({phrase: (hard ID, soft ID)}, -1 for no match) remembers matches across calls, so only new phrases are scored
+def match_all_skill_ids(ngrams, cache=None):
+    registry = get_skill_registry()
+    if cache is None:
+        hard_ids = _match_skill_ids(ngrams, registry.hard_aliases, registry.hard_alias_ids, 90)
+        soft_ids = _match_skill_ids(ngrams, registry.soft_aliases, registry.soft_alias_ids, 80)
+        return hard_ids, soft_ids
 
+    new_phrases = [phrase for phrase in ngrams if phrase not in cache]
+    if new_phrases:
+        hard_best = _best_alias_ids(new_phrases, registry.hard_aliases, registry.hard_alias_ids, 90)
+        soft_best = _best_alias_ids(new_phrases, registry.soft_aliases, registry.soft_alias_ids, 80)
+        cache.update(zip(new_phrases, zip(hard_best.tolist(), soft_best.tolist())))
 
-# Parse Job Description → section-wise weighted skill map
-def weighted_skill_analysis(jd_text, nlp):
-    sections = split_jd_sections_with_guesses(jd_text)
-    hard_skills_weighted = {}
-    soft_skills = set()
-
-    for section_type, section_text in sections:
-        weight = SECTION_WEIGHTS.get(section_type, 0.5)
-        section_doc = nlp(section_text)
-        section_ngrams = get_ngrams(section_doc)
-
-        # Hard skills per section
-        for phrase in section_ngrams:
-            result = process.extractOne(phrase, ALL_SKILL_ALIASES, scorer=fuzz.token_sort_ratio)
-            if result:
-                best_alias, score, _ = result
-                if score >= 90:
-                    canonical = skills_alias_to_canonical[best_alias]
-                    hard_skills_weighted[canonical] = hard_skills_weighted.get(canonical, 0) + weight
+    matches = np.array([cache[phrase] for phrase in ngrams], dtype=ID_DTYPE).reshape(-1, 2)
+    hard_ids, soft_ids = matches[:, 0], matches[:, 1]
+    return np.unique(hard_ids[hard_ids >= 0]), np.unique(soft_ids[soft_ids >= 0])
+
+
+# Resume hard and soft skill IDs from a single n-gram pass
+def extract_all_skill_ids(doc):
+    return match_all_skill_ids(get_ngrams(doc))
+
+
+# Parse many Job Descriptions at once → [(hard IDs, hard weights, soft IDs)] per JD
+def weighted_skill_ids_batch(jd_texts, nlp, batch_size=32):
+    registry = get_skill_registry()
+    n_skills = len(registry.skill_names)
+
+    sections = [
+        (jd_index, SECTION_WEIGHTS.get(section_type, 0.5), section_text)
+        for jd_index, jd_text in enumerate(jd_texts)
+        for section_type, section_text in split_jd_sections_with_guesses(jd_text)
+    ]
+    section_docs = nlp.pipe((section_text for _, _, section_text in sections), batch_size=batch_size)
+    section_ngrams = [list(get_ngrams(doc)) for doc in section_docs]
+
+    # Each distinct phrase is matched once, however many sections or JDs contain it
+    phrases = sorted(set().union(*section_ngrams))
+    phrase_index = {phrase: i for i, phrase in enumerate(phrases)}
+    hard_best = _best_alias_ids(phrases, registry.hard_aliases, registry.hard_alias_ids, 90)
+    soft_best = _best_alias_ids(phrases, registry.soft_aliases, registry.soft_alias_ids, 80)
+
+    hard_weights = np.zeros((len(jd_texts), n_skills))
+    soft_found = np.zeros((len(jd_texts), n_skills), dtype=bool)
+
+    for (jd_index, weight, _), ngrams in zip(sections, section_ngrams):
+        idx = np.fromiter((phrase_index[p] for p in ngrams), dtype=np.int64, count=len(ngrams))
+
+        # Hard skills per section: every matching phrase adds the section weight
+        hard_hits = hard_best[idx]
+        np.add.at(hard_weights[jd_index], hard_hits[hard_hits >= 0], weight)
 
         # Soft skills per section
-        for phrase in section_ngrams:
-            result = process.extractOne(phrase, ALL_SSKILLS_ALIASES, scorer=fuzz.token_sort_ratio)
-            if result:
-                best_alias, score, _ = result
-                if score >= 80:
-                    canonical = sskills_alias_to_canonical[best_alias]
-                    soft_skills.add(canonical)
-
-    return hard_skills_weighted, soft_skills
+        soft_hits = soft_best[idx]
+        soft_found[jd_index, soft_hits[soft_hits >= 0]] = True
+
+    results = []
+    for jd_index in range(len(jd_texts)):
+        hard_ids = np.flatnonzero(hard_weights[jd_index]).astype(ID_DTYPE)
+        soft_ids = np.flatnonzero(soft_found[jd_index]).astype(ID_DTYPE)
+        results.append((hard_ids, hard_weights[jd_index, hard_ids], soft_ids))
+    return results
+
+
+# Parse Job Description → section-wise weighted skill IDs (hard IDs, hard weights, soft IDs)
+def weighted_skill_ids(jd_text, nlp):
+    return weighted_skill_ids_batch([jd_text], nlp)[0]
+
+
+# Parse Job Description → section-wise weighted skill map
+def weighted_skill_analysis(jd_text, nlp):
+    registry = get_skill_registry()
+    hard_ids, weights, soft_ids = weighted_skill_ids(jd_text, nlp)
+    hard_skills_weighted = dict(zip(registry.skill_names_of(hard_ids), weights.tolist()))
+    return hard_skills_weighted, set(registry.skill_names_of(soft_ids))
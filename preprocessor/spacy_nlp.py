@@ -1,4 +1,7 @@
-import spacy
+from functools import lru_cache
 
+# One pipeline per model name per process; spaCy itself is only imported on first use
+@lru_cache(maxsize=None)
 def load_spacy_nlp_model(model_name="en_core_web_sm"):
+    import spacy
     return spacy.load(model_name)
@@ -0,0 +1,109 @@
+import os
+import csv
+import sys
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from preprocessor.batch import find_resumes, init_pool_worker
+from preprocessor.parser import extract_text_from_path
+from preprocessor.skills import extract_all_skill_ids, weighted_skill_ids
+from preprocessor.skill_registry import get_skill_registry
+from preprocessor.spacy_nlp import load_spacy_nlp_model
+from recommender.job_match import score_match
+
+CSV_FIELDS = ["Resume", "Compatibility (%)", "Hard Skills (%)", "Soft Skills (%)", "Missing Core Skills", "Error"]
+
+# Per-process state: every worker holds its own spaCy model, lexicon and the pre-analyzed JD
+_worker = {}
+
+
+def _load_worker(jd_skills):
+    _worker["nlp"] = load_spacy_nlp_model()
+    _worker["jd_skills"] = jd_skills
+    get_skill_registry()
+
+
+def _screen_resume(path):
+    try:
+        text = extract_text_from_path(path)
+        resume_hard_ids, resume_soft_ids = extract_all_skill_ids(_worker["nlp"](text))
+        return path, score_match(resume_hard_ids, resume_soft_ids, *_worker["jd_skills"]), None
+    except Exception as e:
+        return path, None, str(e)
+
+
+def screen_resumes(jd_text, resume_paths, workers=None):
+    """
+    Scores resumes against one JD, yielding (path, JobMatchResult, error) as each finishes.
+    The JD is analyzed once in the parent; resumes are fanned out over a process pool.
+    """
+    nlp = load_spacy_nlp_model()
+    jd_skills = weighted_skill_ids(jd_text, nlp)
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1:
+        _worker.update(nlp=nlp, jd_skills=jd_skills)
+        for path in resume_paths:
+            yield _screen_resume(path)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_pool_worker, initargs=(_load_worker, jd_skills)) as pool:
+        futures = [pool.submit(_screen_resume, path) for path in resume_paths]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def result_row(path, result, error=None):
+    if result is None:
+        return {"Resume": os.path.basename(path), "Compatibility (%)": "", "Hard Skills (%)": "", "Soft Skills (%)": "", "Missing Core Skills": "", "Error": error}
+    return {
+        "Resume": os.path.basename(path),
+        "Compatibility (%)": result.final_score,
+        "Hard Skills (%)": round(result.hard_pct),
+        "Soft Skills (%)": round(result.soft_pct),
+        "Missing Core Skills": ", ".join(result.missing_hard_buckets()[0]),
+        "Error": "",
+    }
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Rank a folder of resumes against one job description.")
+    arg_parser.add_argument("jd", help="Job description file (PDF, DOCX or TXT)")
+    arg_parser.add_argument("resume_dir", help="Folder of PDF/DOCX resumes")
+    arg_parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    arg_parser.add_argument("--csv", help="Write rows to this CSV as they complete")
+    args = arg_parser.parse_args(argv)
+
+    resume_paths = find_resumes(args.resume_dir)
+    jd_text = extract_text_from_path(args.jd)
+
+    csv_file = open(args.csv, "w", newline="", encoding="utf-8") if args.csv else None
+    writer = csv.DictWriter(csv_file, fieldnames=CSV_FIELDS) if csv_file else None
+    if writer:
+        writer.writeheader()
+
+    rows = []
+    start = time.perf_counter()
+    try:
+        for done, (path, result, error) in enumerate(screen_resumes(jd_text, resume_paths, args.workers), 1):
+            row = result_row(path, result, error)
+            rows.append(row)
+            if writer:
+                writer.writerow(row)
+                csv_file.flush()
+            status = f"{row['Compatibility (%)']}%" if result else f"error: {error}"
+            print(f"[{done}/{len(resume_paths)}] {row['Resume']}: {status}", file=sys.stderr)
+    finally:
+        if csv_file:
+            csv_file.close()
+    elapsed = time.perf_counter() - start
+
+    # Final ranked table, best match first
+    ranked = sorted((r for r in rows if not r["Error"]), key=lambda r: r["Compatibility (%)"], reverse=True)
+    for rank, row in enumerate(ranked, 1):
+        print(f"{rank:>3}. {row['Compatibility (%)']:>3}%  {row['Resume']}")
+    print(f"{len(rows)} resumes in {elapsed:.2f}s ({len(rows) / elapsed if elapsed else 0:.1f} resumes/s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+import os
+import hashlib
+from dataclasses import dataclass
+import numpy as np
+from preprocessor.skills import extract_all_skill_ids, weighted_skill_ids_batch
+from preprocessor.skill_registry import get_skill_registry
+from preprocessor.parser import extract_text_from_docx
+
+# Hard skills contribute 90% of the overall score, soft skills 10%
+HARD_SKILL_WEIGHT = 0.9
+SOFT_SKILL_WEIGHT = 0.1
+
+# Bundled sample JDs, also used as the multi-JD benchmark set
+SAMPLE_JD_DIR = "data/job_descriptions"
+
+# JD weight thresholds for the core / important / optional buckets
+CORE_SKILL_WEIGHT = 2.5
+IMPORTANT_SKILL_WEIGHT = 1.0
+
+
+def content_hash(text: str):
+    """Stable hash of a document's text, used to key cached analyses."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def categorize(skills_dict):
+    """Splits {skill: JD weight} into sorted core, important and optional lists."""
+    core, imp, opt = [], [], []
+    for s, w in skills_dict.items():
+        if w >= CORE_SKILL_WEIGHT: core.append(s)
+        elif w >= IMPORTANT_SKILL_WEIGHT: imp.append(s)
+        else: opt.append(s)
+    return sorted(core), sorted(imp), sorted(opt)
+
+
+@dataclass(frozen=True)
+class JobMatchResult:
+    """Everything the JobMatcher page renders, computed once per (resume, JD, lexicon)."""
+    jd_hard_skills_weighted: dict
+    matched_hard_skills: tuple
+    missing_hard_skills: tuple
+    matched_soft_skills: tuple
+    missing_soft_skills: tuple
+    hard_pct: float
+    soft_pct: float
+    hard_score_contribution: float
+    soft_score_contribution: float
+    final_score: int
+    # Every skill found in the resume, for ranking what to learn next
+    resume_skill_ids: tuple = ()
+
+    def matched_hard_buckets(self):
+        return categorize({s: self.jd_hard_skills_weighted[s] for s in self.matched_hard_skills})
+
+    def missing_hard_buckets(self):
+        return categorize({s: self.jd_hard_skills_weighted[s] for s in self.missing_hard_skills})
+
+    @property
+    def all_missing_skills(self):
+        return list(self.missing_hard_skills) + list(self.missing_soft_skills)
+
+
+def score_match(resume_hard_ids, resume_soft_ids, jd_hard_ids, jd_hard_weights, jd_soft_ids):
+    """
+    JobMatcher scoring on skill ID vectors: weighted hard-skill coverage (90%) plus soft-skill
+    coverage (10%), with hard skills bucketed by JD weight. No NLP happens here.
+    """
+    registry = get_skill_registry()
+
+    hard_matched_mask = np.isin(jd_hard_ids, resume_hard_ids)
+    matched_soft_ids = np.intersect1d(jd_soft_ids, resume_soft_ids)
+    missing_soft_ids = np.setdiff1d(jd_soft_ids, resume_soft_ids)
+
+    # Score Generation
+    total_jd_hard_weight = jd_hard_weights.sum()
+    matched_hard_weight = jd_hard_weights[hard_matched_mask].sum()
+
+    hard_pct = float(matched_hard_weight / total_jd_hard_weight * 100) if total_jd_hard_weight else 0.0
+    soft_pct = len(matched_soft_ids) / len(jd_soft_ids) * 100 if len(jd_soft_ids) else 0.0
+
+    hard_score_contribution = hard_pct * HARD_SKILL_WEIGHT
+    soft_score_contribution = soft_pct * SOFT_SKILL_WEIGHT
+
+    return JobMatchResult(
+        jd_hard_skills_weighted=dict(zip(registry.skill_names_of(jd_hard_ids), jd_hard_weights.tolist())),
+        matched_hard_skills=tuple(registry.skill_names_of(jd_hard_ids[hard_matched_mask])),
+        missing_hard_skills=tuple(registry.skill_names_of(jd_hard_ids[~hard_matched_mask])),
+        matched_soft_skills=tuple(registry.skill_names_of(matched_soft_ids)),
+        missing_soft_skills=tuple(registry.skill_names_of(missing_soft_ids)),
+        hard_pct=hard_pct,
+        soft_pct=soft_pct,
+        hard_score_contribution=hard_score_contribution,
+        soft_score_contribution=soft_score_contribution,
+        final_score=round(hard_score_contribution + soft_score_contribution),
+        resume_skill_ids=tuple(np.union1d(resume_hard_ids, resume_soft_ids).tolist()),
+    )
+
+
+def match_resume_to_jds(resume_text, jd_texts, nlp):
+    """
+    Scores one resume against many JDs. Resume skills are extracted once and all JDs are
+    parsed through one batched nlp.pipe / matching pass. Results follow the order of `jd_texts`.
+    """
+    resume_hard_ids, resume_soft_ids = extract_all_skill_ids(nlp(resume_text))
+    return [
+        score_match(resume_hard_ids, resume_soft_ids, *jd_skills)
+        for jd_skills in weighted_skill_ids_batch(jd_texts, nlp)
+    ]
+
+
+def match_resume_to_jd(resume_text, jd_text, nlp):
+    """Pure resume-vs-JD skill match: extraction, weighting and scoring with no UI side effects."""
+    return match_resume_to_jds(resume_text, [jd_text], nlp)[0]
+
+
+def rank_job_matches(jd_names, results):
+    """Table rows for a multi-JD run, best compatibility first."""
+    rows = [
+        {
+            "Job Description": name,
+            "Compatibility (%)": result.final_score,
+            "Hard Skills (%)": round(result.hard_pct),
+            "Soft Skills (%)": round(result.soft_pct),
+            "Matched Skills": len(result.matched_hard_skills) + len(result.matched_soft_skills),
+            "Missing Core Skills": ", ".join(result.missing_hard_buckets()[0]),
+        }
+        for name, result in zip(jd_names, results)
+    ]
+    return sorted(rows, key=lambda row: row["Compatibility (%)"], reverse=True)
+
+
+def load_sample_job_descriptions(jd_dir=SAMPLE_JD_DIR):
+    """{name: text} for the bundled JDs; a .txt wins over a .docx with the same name."""
+    samples = {}
+    for file_name in sorted(os.listdir(jd_dir)):
+        stem, ext = os.path.splitext(file_name)
+        path = os.path.join(jd_dir, file_name)
+        if ext == ".txt":
+            with open(path, "r", encoding="utf-8") as f:
+                samples[stem] = f.read()
+        elif ext == ".docx" and not os.path.exists(os.path.join(jd_dir, f"{stem}.txt")):
+            with open(path, "rb") as f:
+                samples[stem] = extract_text_from_docx(f.read())
+    return samples
+
+
+if __name__ == "__main__":
+    # Benchmark: one resume against the bundled JDs, per-JD calls vs the batched multi-JD path
+    import sys
+    import time
+    from preprocessor.parser import extract_text_from_pdf
+    from preprocessor.spacy_nlp import load_spacy_nlp_model
+
+    resume_path = sys.argv[1] if len(sys.argv) > 1 else "data/resumes/SD w Data Scientist and DevOps.pdf"
+    with open(resume_path, "rb") as f:
+        resume_text = extract_text_from_pdf(f.read())
+    samples = load_sample_job_descriptions()
+    nlp = load_spacy_nlp_model()
+
+    start = time.perf_counter()
+    single = [match_resume_to_jd(resume_text, jd_text, nlp) for jd_text in samples.values()]
+    single_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batched = match_resume_to_jds(resume_text, list(samples.values()), nlp)
+    batched_time = time.perf_counter() - start
+
+    for row in rank_job_matches(samples.keys(), batched):
+        print(f"{row['Compatibility (%)']:>4}%  {row['Job Description']}")
+    print(f"{len(samples)} JDs: one-by-one {single_time:.2f}s, batched {batched_time:.2f}s, identical={single == batched}")
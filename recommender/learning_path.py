@@ -0,0 +1,91 @@
+from functools import lru_cache
+import numpy as np
+from preprocessor.skill_registry import get_skill_registry
+
+# A role still missing this many skills or fewer counts partly toward each of them (1/k of a role)
+FEW_MISSING = 3
+
+
+def skill_cooccurrence(role_skills):
+    """Skill × skill co-occurrence counts: how many roles list both skills."""
+    counts = role_skills.astype(np.float32)
+    graph = counts.T @ counts
+    np.fill_diagonal(graph, 0)
+    return graph
+
+
+def pagerank(graph, damping=0.85, tol=1e-10, max_iter=100):
+    """PageRank by power iteration over a weighted, undirected adjacency matrix."""
+    n = graph.shape[0]
+    if n == 0:
+        return np.zeros(0)
+
+    out_weight = graph.sum(axis=0)
+    dangling = out_weight == 0
+    transition = np.divide(graph, out_weight, out=np.zeros_like(graph), where=~dangling)
+
+    rank = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        # Isolated skills spread their rank evenly so the total stays at 1
+        new_rank = damping * (transition @ rank + rank[dangling].sum() / n) + (1 - damping) / n
+        if np.abs(new_rank - rank).sum() < tol:
+            return new_rank
+        rank = new_rank
+    return rank
+
+
+class LearningPathIndex:
+    """Role × skill matrix, role sizes and centrality, precomputed so ranking is one small product and a sort."""
+
+    def __init__(self, registry):
+        self.registry = registry
+        self.role_skills = registry.role_skills.astype(np.float32)
+        # Number of skills each role in job_to_skill.json lists
+        self.role_sizes = self.role_skills.sum(axis=1)
+        self.centrality = pagerank(skill_cooccurrence(registry.role_skills))
+
+    def roles_unlocked(self, skill_ids, have_skill_ids=()):
+        """
+        For a user who has `have_skill_ids`, per skill in `skill_ids` (which they lack) →
+        (roles it would complete as their last missing skill, partial credit of 1/k for every
+        role it is one of k <= FEW_MISSING missing skills of).
+        """
+        have = np.zeros(self.role_skills.shape[1], dtype=np.float32)
+        have[np.asarray(have_skill_ids, dtype=np.int64)] = 1
+        missing = self.role_sizes - self.role_skills @ have
+        needs = self.role_skills[:, skill_ids].T
+        completes = needs @ (missing == 1).astype(np.float32)
+        closer = needs @ np.where((missing >= 1) & (missing <= FEW_MISSING), 1 / np.maximum(missing, 1), 0).astype(np.float32)
+        return completes, closer
+
+    def rank_skills(self, skills, have_skill_ids=()):
+        """
+        Orders skills by how many additional roles each would unlock for a user who has
+        `have_skill_ids`, then by how much closer it brings nearly-complete roles, then by
+        co-occurrence centrality. Skills unknown to the registry keep their alphabetical order at the end.
+        """
+        skills = sorted(skills)
+        ids = np.array([self.registry.skill_id(s) for s in skills], dtype=np.int64)
+        known = ids >= 0
+        completes, closer = self.roles_unlocked(ids[known], have_skill_ids)
+        unlocked = np.full(len(skills), -1.0)
+        nearer = np.zeros(len(skills))
+        unlocked[known], nearer[known] = completes, closer
+        centrality = np.where(known, self.centrality[ids], 0)
+        order = np.lexsort((-centrality, -nearer, -unlocked))
+        return [skills[i] for i in order]
+
+
+@lru_cache(maxsize=1)
+def _build_learning_path_index(registry):
+    return LearningPathIndex(registry)
+
+
+def get_learning_path_index():
+    """Shared index; rebuilt whenever the registry reloads because a dataset changed."""
+    return _build_learning_path_index(get_skill_registry())
+
+
+def rank_missing_skills(missing_skills, have_skill_ids=()):
+    """Missing skills, those that unlock the most further roles for this user's `have_skill_ids` first."""
+    return get_learning_path_index().rank_skills(missing_skills, have_skill_ids)
@@ -1,4 +1,12 @@
 import streamlit as st
+from functools import lru_cache
+from recommender.learning_path import rank_missing_skills
+
+# Logos are read from disk once per process instead of on every panel rerun
+@lru_cache(maxsize=None)
+def load_logo(path):
+    with open(path, "rb") as f:
+        return f.read()
 
 def get_youtube_link(skill: str) -> str:
     query = skill.replace(" ", "+")
@@ -16,9 +24,11 @@ def get_edX_link(skill: str) -> str:
     query = skill.replace(" ", "+")
     return f"https://www.edx.org/search?q={query}"
 
-def learning_resources(missing_skills):
+# Runs as a fragment: picking a skill reruns only this panel, not the page's parsing and analysis
+@st.fragment
+def learning_resources(missing_skills, have_skill_ids=()):
     st.markdown("<br>", unsafe_allow_html=True)
-    selected_skill = st.selectbox("Pick a missing skill to explore:", sorted(missing_skills), index=None, placeholder="Select Skill")
+    selected_skill = st.selectbox("Pick a missing skill to explore (those unlocking the most roles first):", rank_missing_skills(missing_skills, have_skill_ids), index=None, placeholder="Select Skill")
     st.markdown("<br><br>", unsafe_allow_html=True)
 
     if selected_skill:
@@ -29,21 +39,21 @@ def learning_resources(missing_skills):
 
         col1, col2 = st.columns(2)
         with col1:
-            st.image("ui/assets/youtube.png", use_container_width=True)
+            st.image(load_logo("ui/assets/youtube.png"), use_container_width=True)
             st.link_button(f"▶️ Learn {selected_skill} on YouTube", yt_url, use_container_width=True)
         
             st.markdown("<br>", unsafe_allow_html=True)
 
-            st.image("ui/assets/coursera.png", use_container_width=True)
+            st.image(load_logo("ui/assets/coursera.png"), use_container_width=True)
             st.link_button(f"📘 Learn {selected_skill} on Coursera", coursera_url, use_container_width=True)
         
         with col2:
-            st.image("ui/assets/udemy.png", use_container_width=True)
+            st.image(load_logo("ui/assets/udemy.png"), use_container_width=True)
             st.link_button(f"🎓 Learn {selected_skill} on Udemy", udemy_url, use_container_width=True)
             
             st.markdown("<br>", unsafe_allow_html=True)
 
-            st.image("ui/assets/edX.png", use_container_width=True)
+            st.image(load_logo("ui/assets/edx.png"), use_container_width=True)
             st.link_button(f"💡 Learn {selected_skill} on edX", edX_url, use_container_width=True)
 
         st.markdown("<br>", unsafe_allow_html=True)
@@ -0,0 +1,53 @@
+from functools import lru_cache
+import numpy as np
+from preprocessor.skill_registry import get_skill_registry, ID_DTYPE
+
+# Roles below this Jaccard similarity are not worth suggesting as adjacent
+MIN_ADJACENT_SIMILARITY = 0.3
+
+
+def build_role_similarity(role_skills):
+    """Role × role Jaccard similarity over a boolean role × skill incidence matrix."""
+    counts = role_skills.astype(np.float32)
+    intersection = counts @ counts.T
+    sizes = counts.sum(axis=1)
+    union = sizes[:, None] + sizes[None, :] - intersection
+    similarity = np.divide(intersection, union, out=np.zeros_like(intersection), where=union > 0)
+    np.fill_diagonal(similarity, 0)
+    return similarity
+
+
+class RoleSimilarityIndex:
+    """Precomputed role similarities with each row's neighbours already sorted best-first."""
+
+    def __init__(self, registry):
+        self.registry = registry
+        self.similarity = build_role_similarity(registry.role_skills)
+        # Stable sort keeps catalogue order among equally similar roles
+        self.neighbours = np.argsort(-self.similarity, axis=1, kind="stable").astype(ID_DTYPE)
+
+    def adjacent_roles(self, role, top_n=3, exclude=(), min_similarity=MIN_ADJACENT_SIMILARITY):
+        """Most similar roles to `role` as (title, similarity) pairs, skipping anything in `exclude`."""
+        role_id = self.registry.role_id(role)
+        if role_id < 0:
+            return []
+
+        excluded = {self.registry.role_id(r) for r in exclude}
+        adjacent = []
+        for other_id in self.neighbours[role_id]:
+            score = float(self.similarity[role_id, other_id])
+            if score < min_similarity or len(adjacent) == top_n:
+                break
+            if other_id not in excluded:
+                adjacent.append((self.registry.role_names[other_id], score))
+        return adjacent
+
+
+@lru_cache(maxsize=1)
+def _build_role_index(registry):
+    return RoleSimilarityIndex(registry)
+
+
+def get_role_similarity_index():
+    """Shared index; rebuilt whenever the registry reloads because job_to_skill.json changed."""
+    return _build_role_index(get_skill_registry())
@@ -1,34 +1,40 @@
 import json
-from collections import defaultdict
+from functools import lru_cache
+import numpy as np
+from preprocessor.skill_registry import get_skill_registry
+from recommender.role_similarity import get_role_similarity_index
 
-def recommend_top_jobs(resume_skills, top_n=5):
-    skill_to_job_path = "data/dataset/skill_to_job.json"
-    job_definitions_path = "data/dataset/job_definition.json"
-
-    # Load data
-    with open(skill_to_job_path, "r", encoding="utf-8") as f:
-        raw_skill_to_job = json.load(f)
+@lru_cache(maxsize=1)
+def load_job_definitions(job_definitions_path="data/dataset/job_definition.json"):
     with open(job_definitions_path, "r", encoding="utf-8") as f:
-        job_descriptions = json.load(f)
-
-    # Normalize keys in skill_to_job
-    skill_to_job = {skill.lower(): job for skill, job in raw_skill_to_job.items()}
+        return json.load(f)
 
-    # Score jobs
-    job_scores = defaultdict(lambda: {"count": 0, "skills": []})
-    for skill in resume_skills:
-        matching_jobs = skill_to_job.get(skill.lower(), [])
-        for job in matching_jobs:
-            job_scores[job]["count"] += 1 # type: ignore
-            job_scores[job]["skills"].append(skill) # type: ignore
-
-    # Sort top jobs
-    sorted_jobs = sorted(job_scores.items(), key=lambda x: x[1]["count"], reverse=True)
+def recommend_top_jobs(resume_skills, top_n=5):
+    registry = get_skill_registry()
+    role_index = get_role_similarity_index()
+    job_descriptions = load_job_definitions()
+
+    # Score jobs: one count per resume skill that skill_to_job maps to the job.
+    # Rows stay in resume order, since ties are broken by which skill reached a job first
+    skill_ids = registry.ordered_skill_ids(resume_skills)
+    if not len(skill_ids):
+        return []
+    hits = registry.skill_roles[skill_ids]
+    job_counts = hits.sum(axis=0)
+
+    # Sort top jobs by count; ties keep the order in which jobs were first hit: by the first
+    # resume skill that maps to the job, then by the job's place in that skill's skill_to_job list
+    first_skill = hits.argmax(axis=0)
+    list_rank = registry.skill_role_rank[skill_ids[first_skill], np.arange(hits.shape[1])]
+    scored_jobs = np.flatnonzero(job_counts)
+    sorted_jobs = scored_jobs[np.lexsort((list_rank[scored_jobs], first_skill[scored_jobs], -job_counts[scored_jobs]))]
 
     # Format result
+    top_titles = [registry.recommended_role_names[job_id] for job_id in sorted_jobs[:top_n]]
     top_jobs = []
-    for job, info in sorted_jobs[:top_n]:
-        matched_skills = sorted(set(info["skills"])) # type: ignore
+    for job_id in sorted_jobs[:top_n]:
+        job = registry.recommended_role_names[job_id]
+        matched_skills = sorted(registry.skill_names_of(skill_ids[hits[:, job_id]]))
         descriptions = []
 
         # Split on slash and collect descriptions for each part
@@ -47,9 +53,11 @@ def recommend_top_jobs(resume_skills, top_n=5):
 
         top_jobs.append({
             "title": job,
-            "match_count": info["count"],
+            "match_count": int(job_counts[job_id]),
             "matched_skills": matched_skills,
-            "description": full_description
+            "description": full_description,
+            # "Also consider" roles come straight from the precomputed similarity index
+            "adjacent_roles": [title for title, _ in role_index.adjacent_roles(job, exclude=top_titles)]
         })
 
     return top_jobs
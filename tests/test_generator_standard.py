@@ -0,0 +1,57 @@
+import io
+from docx import Document
+from docx.oxml.ns import qn
+from builder import generator_standard
+
+TEMPLATE_PATH = "builder/template.docx"
+
+
+def sample_resume():
+    return {
+        "personal": {
+            "name": "Jane Doe", "title": "Backend Engineer", "location": "Pune", "email": "jane@example.com",
+            "phone": "+91 90000 00000", "website": "https://jane.dev",
+            "linkedin": "https://linkedin.com/in/jane", "github": "https://github.com/jane",
+        },
+        "summary": "Backend engineer building reliable APIs.",
+        "education": [{
+            "university": "State University", "location": "Pune", "degree": "B.Tech", "start_date": "2018",
+            "end_date": "2022", "gpa": "8.9", "coursework": "Databases\nDistributed Systems",
+        }],
+        "experience": [{
+            "job_title": "Software Engineer", "company": "Acme", "location": "Remote", "start_date": "2022",
+            "end_date": "Present", "responsibilities": ["Cut p95 latency by 40%", "Replaced an O(n²) merge with O(n log n)"],
+        }],
+        "projects": [{
+            "title": "Tracker", "deployment": "https://tracker.dev", "tech_stack": "Python, SQL",
+            "link": "https://github.com/jane/tracker", "description": "Built the API\nWrote the ingestion job",
+        }],
+        "skills": {"technical": ["Python", "SQL"], "soft": ["Communication"]},
+        "certifications": [{"title": "AWS Developer", "issuer": "AWS", "link": "https://aws.amazon.com"}],
+        "achievements_hobbies": {"achievements": ["Hackathon winner"], "hobbies": ["Chess"]},
+    }
+
+
+def render(template_path):
+    return Document(io.BytesIO(generator_standard.generate_structured_resume(sample_resume(), template_path).getvalue()))
+
+
+def test_renders_with_repo_template():
+    doc = render(TEMPLATE_PATH)
+    template = Document(TEMPLATE_PATH)
+
+    assert doc.paragraphs[0].text == "Jane Doe\tBackend Engineer"
+    # Page setup comes from the template; its placeholder body does not
+    assert doc.sections[0].left_margin == template.sections[0].left_margin
+    assert not any("<" in p.text for p in doc.paragraphs)
+
+    bullets = [p for p in doc.paragraphs if p.style.name == "List Bullet"]
+    assert len(bullets) == 5
+    num_id = int(bullets[0].style.element.find(".//" + qn("w:numId")).get(qn("w:val")))
+    assert doc.part.numbering_part.element.num_having_numId(num_id) is not None
+
+
+def test_missing_template_falls_back_to_default_document():
+    doc = render("builder/no_such_template.docx")
+    assert doc.paragraphs[0].text == "Jane Doe\tBackend Engineer"
+    assert doc.styles["Normal"].font.name == "Cambria"
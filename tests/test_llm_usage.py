@@ -0,0 +1,36 @@
+import pytest
+from llm.backends import FakeBackend, set_backend
+from llm.prompt_budget import estimate_tokens
+from llm.resilience import call_llm, stream_llm
+
+PROMPT = "Rewrite this resume section. " * 10
+ANSWER = "Led a team of five engineers. " * 20
+
+
+@pytest.fixture
+def backend():
+    backend = FakeBackend(default=ANSWER, chunk_size=7)
+    set_backend(backend)
+    yield backend
+    set_backend(None)
+
+
+def test_call_llm_records_estimated_tokens(backend):
+    usage = {}
+    call_llm("test-usage-key", "fake-model", PROMPT, usage=usage)
+    call_llm("test-usage-key", "fake-model", PROMPT, usage=usage)
+    assert usage == {"calls": 2, "input_tokens": 2 * estimate_tokens(PROMPT), "output_tokens": 2 * estimate_tokens(ANSWER)}
+
+
+def test_stream_llm_records_estimated_tokens(backend):
+    usage = {}
+    assert "".join(stream_llm("test-usage-key", "fake-model", PROMPT, usage=usage)) == ANSWER
+    assert usage == {"calls": 1, "input_tokens": estimate_tokens(PROMPT), "output_tokens": estimate_tokens(ANSWER)}
+
+
+def test_abandoned_stream_records_what_arrived(backend):
+    usage = {}
+    stream = stream_llm("test-usage-key", "fake-model", PROMPT, usage=usage)
+    next(stream)
+    stream.close()
+    assert usage == {"calls": 1, "input_tokens": estimate_tokens(PROMPT), "output_tokens": estimate_tokens(ANSWER[:7])}
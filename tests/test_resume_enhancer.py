@@ -0,0 +1,25 @@
+from unittest import mock
+import pytest
+from builder import resume_enhancer
+
+SECTIONS = [("professional summary", "Backend engineer."), ("achievements", "Hackathon winner")]
+
+
+@pytest.mark.parametrize("enhance", [resume_enhancer.enhance_sections, resume_enhancer.enhance_sections_batched])
+def test_missing_key_reports_every_section_once(enhance):
+    progress = []
+    with mock.patch.object(resume_enhancer, "get_suitable_gemini_model") as resolve:
+        results = enhance(SECTIONS, "Professional", "", on_progress=lambda *args: progress.append(args))
+    assert results == [(text, resume_enhancer.NO_API_KEY_PROBLEM) for _, text in SECTIONS]
+    assert progress == [(2, 2, "all sections")]
+    resolve.assert_not_called()
+
+
+@pytest.mark.parametrize("enhance", [resume_enhancer.enhance_sections, resume_enhancer.enhance_sections_batched])
+def test_missing_model_is_resolved_once(enhance):
+    progress = []
+    with mock.patch.object(resume_enhancer, "get_suitable_gemini_model", return_value=None) as resolve:
+        results = enhance(SECTIONS, "Professional", "key", on_progress=lambda *args: progress.append(args))
+    assert results == [(text, resume_enhancer.NO_MODEL_PROBLEM) for _, text in SECTIONS]
+    assert progress == [(2, 2, "all sections")]
+    resolve.assert_called_once_with("key")
@@ -0,0 +1,47 @@
+import json
+import random
+from collections import defaultdict
+from recommender.top_n_jobs import recommend_top_jobs
+
+
+def baseline_top_jobs(resume_skills, top_n):
+    """The ranking recommend_top_jobs had before skills were interned: (title, count, skills) per job."""
+    with open("data/dataset/skill_to_job.json", "r", encoding="utf-8") as f:
+        skill_to_job = {skill.lower(): jobs for skill, jobs in json.load(f).items()}
+
+    job_scores = defaultdict(lambda: {"count": 0, "skills": []})
+    for skill in resume_skills:
+        for job in skill_to_job.get(skill.lower(), []):
+            job_scores[job]["count"] += 1
+            job_scores[job]["skills"].append(skill.lower())
+    sorted_jobs = sorted(job_scores.items(), key=lambda x: x[1]["count"], reverse=True)
+    return [(job, info["count"], sorted(set(info["skills"]))) for job, info in sorted_jobs[:top_n]]
+
+
+def ranked(resume_skills, top_n):
+    return [
+        (job["title"], job["match_count"], sorted(s.lower() for s in job["matched_skills"]))
+        for job in recommend_top_jobs(resume_skills, top_n)
+    ]
+
+
+def test_matches_baseline_ranking():
+    with open("data/dataset/skill_to_job.json", "r", encoding="utf-8") as f:
+        known = list(json.load(f))
+    rng = random.Random(26)
+    for _ in range(200):
+        skills = rng.sample(known, rng.randint(1, 25)) + ["Not A Real Skill"]
+        rng.shuffle(skills)
+        skills = [s.upper() if rng.random() < 0.2 else s for s in skills]
+        top_n = rng.randint(1, 20)
+        assert ranked(skills, top_n) == baseline_top_jobs(skills, top_n), skills
+
+
+def test_ties_follow_resume_order():
+    # ML Engineer is reached first, through Natural Language Processing
+    skills = ["Natural Language Processing", "React", "CSS"]
+    assert ranked(skills, 10) == baseline_top_jobs(skills, 10)
+
+
+def test_no_known_skills():
+    assert recommend_top_jobs(["Not A Real Skill"]) == []